@@ -17,6 +17,8 @@ from PyQt5.QtGui import *
 
 from resources.misc import *
 from resources.CustomQColorDialog import CustomQColorDialog 
+from resources.workSheetIO import LazyItemDict, close_source, rename_source, attach_source
+from resources.workSheetWorker import loadWorkSheetWorker, saveWorkSheetWorker, lazyItemSignals
 
 from resources.displaySingleSerieWindow import displaySingleSerieWindow
 from resources.displayTogetherSeriesWindow import displayTogetherSeriesWindow
@@ -38,9 +40,6 @@ from resources.importDataWindow import importDataWindow
 from resources.defineRandomSerieWindow import defineRandomSerieWindow
 from resources.defineInsolationAstroSerieWindow import defineInsolationAstroSerieWindow
 
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-
 #========================================================================================
 if len(sys.argv[1:]) >= 1:
     filesName = sys.argv[1:]
@@ -106,8 +105,9 @@ def add_item_tree_widget(ws_item, itemDict, position=None, mark=True):
     item.setFlags(item.flags() & ~Qt.ItemIsDropEnabled)
 
     if itemDict['Type'].startswith('Serie'):
-        Serie = itemDict['Serie']
-        if Serie.index.duplicated().any():
+        if isinstance(itemDict, LazyItemDict) and not itemDict.is_loaded():
+            item.setIcon(0, icon_serie)                     # checked when read, by update_serie_icon
+        elif itemDict['Serie'].index.duplicated().any():
             item.setIcon(0, icon_serieDuplicated)
         else:
             item.setIcon(0, icon_serie)
@@ -171,6 +171,15 @@ def add_item_tree_widget(ws_item, itemDict, position=None, mark=True):
     checkboxInverted.stateChanged.connect(lambda: checkboxInverted_changed(checkboxInverted, item))
     tree_widget.setItemWidget(item, 6, checkboxInverted)
 
+#========================================================================================
+def update_serie_icon(itemDict):
+    if not itemDict['Serie'].index.duplicated().any(): return
+
+    icon_serieDuplicated = QIcon(str(app_dir / 'resources' / 'icon_serieDuplicated.png'))
+    for item in tree_widget.get_children():
+        if item.data(0, Qt.UserRole) is itemDict:
+            item.setIcon(0, icon_serieDuplicated)
+
 #========================================================================================
 def on_item_changed(item, column):
     global open_ws
@@ -197,6 +206,12 @@ def on_item_changed(item, column):
             item.setText(0, old_wsName)
             return
 
+        #--------
+        if id(item) in saving_ws:
+            QMessageBox.warning(main_window, "WS being saved", f"The ws '{old_wsName}' is being saved. Please rename it once saved.")
+            item.setText(0, old_wsName)
+            return
+
         #--------
         if os.path.exists(old_wsName) and is_open(old_wsName):
             QMessageBox.warning(main_window, "WS open in another application", f"The ws '{new_wsName}' is already in use. Please close the file.")
@@ -212,7 +227,9 @@ def on_item_changed(item, column):
 
         #--------
         if os.path.exists(old_wsName):
+            close_source(old_wsName)                    # an open file can't be renamed on Windows
             os.rename(old_wsName, new_wsName)
+            rename_source(old_wsName, new_wsName)
         remark_ws(item)
 
         open_ws[id(item)] = new_wsName
@@ -285,133 +302,95 @@ def sync_window_with_item(item):
         interpolationWindow = open_interpolationWindows[key]
         interpolationWindow.sync_with_item(item)
 
+#========================================================================================
+# Worksheet files are read and written in worker threads (resources/workSheetWorker.py),
+# the item dicts being handed back here through queued signals
+#
+#   io_workers: worker -> [sheets done, number of sheets], for the progress bar of the status bar
+#   pending_loads: load workers, the worksheets being added to the tree in the order asked
+#   saving_ws: id(ws_item) -> save worker, a worksheet being saved once at a time
+#   save_errors: files not saved, reported when all the saves are done
+#   exiting: the application quits when all the saves are done
+#========================================================================================
+io_workers = {}
+pending_loads = []
+saving_ws = {}
+save_errors = []
+exiting = False
+
+def start_io(worker, msg):
+    worker.signals.progress.connect(io_progress)
+    io_workers[worker] = [0, 0]
+    io_progress_bar.setValue(io_percent())
+    io_progress_bar.show()
+    main_window.statusBar().showMessage(msg, 5000)
+    QThreadPool.globalInstance().start(worker)
+
+def io_percent():
+    done = sum(done for done, total in io_workers.values())
+    total = sum(total for done, total in io_workers.values())
+    return int(100*done/total) if total else 0
+
+def io_progress(worker, done, total):
+    if worker not in io_workers: return
+    io_workers[worker] = [done, total]
+    io_progress_bar.setValue(io_percent())
+    main_window.statusBar().showMessage(f'{worker.fileName} {worker.action}: sheet {done}/{total}', 5000)
+
+def end_io(worker):
+    io_workers.pop(worker, None)
+    if not io_workers:
+        io_progress_bar.hide()
+
 #========================================================================================
 def load_WorkSheet(fileName):
 
     if not os.path.exists(fileName): return
 
-    if fileName in open_ws.values():
+    if fileName in open_ws.values() or fileName in [worker.fileName for worker in pending_loads]:
         msg = f'{fileName} already loaded'
         main_window.statusBar().showMessage(msg, 5000)
         return 
 
-    main_window.statusBar().showMessage(fileName + ' loading', 5000)
-    QApplication.processEvents()
+    worker = loadWorkSheetWorker(fileName)
+    worker.signals.finished.connect(load_finished)
+    worker.signals.error.connect(lambda worker, message: load_finished(worker, ([], [], message)))
+    pending_loads.append(worker)
 
-    #--------------------------------------------------------------------
-    sheetNames = pd.read_excel(fileName, sheet_name=None).keys()
-
-    itemDict_list = []
-
-    for sheetName in sheetNames:
-
-        #-------------------------------------
-        if sheetName.startswith('Serie Id-'):
-
-            try:
-                df = pd.read_excel(fileName, sheet_name=sheetName, na_filter=False)
-
-                color = QColor(df['Color'][0])
-                if color.isValid():
-                    Color = df['Color'][0]
-                else:
-                    Color = generate_color()
-
-                serieDict = {
-                    'Id': 'Id-' + sheetName.split('Serie Id-')[1],
-                    'Type': df['Type'][0],
-                    'Name': df['Name'][0],
-                    'X':  df.columns[0],
-                    'Y':  df.columns[1],
-                    'Y axis inverted': bool(df['Y axis inverted'][0]),
-                    'Color': Color,
-                    'Comment': df['Comment'][0],
-                    'History': df['History'][0],
-                    'Serie': pd.Series(addNanList(df.iloc[:,1]), index=addNanList(df.iloc[:,0]))
-                }
-
-                if 'InterpolationMode' in df.columns:
-                    serieDict = serieDict | {
-                        'InterpolationMode': df['InterpolationMode'][0],
-                        'X1Coords': cleanSpaceList(df['X1Coords']),
-                        'X2Coords': cleanSpaceList(df['X2Coords']),
-                        'XOriginal': df.columns[11],
-                        'XOriginalValues': addNanList(df.iloc[:,11])
-                    }
-
-                itemDict_list.append(serieDict)
-
-            except:
-                msg = f"The file '{fileName}' contains a serie that is wrongly formatted in {sheetName} sheet."
-                QMessageBox.critical(main_window, "Load file", msg)
-                main_window.statusBar().showMessage(msg, 5000)
-                QApplication.processEvents()
-
-        #-------------------------------------
-        elif sheetName.startswith('FILTER Id-') or  sheetName.startswith('SAMPLE Id-'):
-            
-            try:
-                df = pd.read_excel(fileName, sheet_name=sheetName, na_filter=False)
-                filterDict = {
-                        'Id': 'Id-' + sheetName.split('Id-')[1],
-                        'Type': df['Type'][0],
-                        'Name': df['Name'][0],
-                        'Parameters': str(df['Parameters'][0]),
-                        'Comment': df['Comment'][0],
-                        'History': df['History'][0]
-                }
-
-                if 'XCoords' in df.columns:                 # for SAMPLE
-                    filterDict = filterDict | {
-                        'XCoords': addNanList(df['X2Coords'])
-                    }
-
-                itemDict_list.append(filterDict)
-
-            except:
-                msg = f"The file '{fileName}' contains a FILTER/SAMPLE that is wrongly formatted in {sheetName} sheet."
-                QMessageBox.critical(main_window, "Load file", msg)
-                main_window.statusBar().showMessage(msg, 5000)
-                QApplication.processEvents()
-
-        #-------------------------------------
-        elif sheetName.startswith('INTERPOLATION Id-'):
-
-            try:
-                df = pd.read_excel(fileName, sheet_name=sheetName, na_filter=False)
-                interpolationDict = {
-                        'Id': 'Id-' + sheetName.split('INTERPOLATION Id-')[1],
-                        'Type': df['Type'][0],
-                        'Name': df['Name'][0],
-                        'X1Coords': df['X1Coords'].values,
-                        'X2Coords': df['X2Coords'].values,
-                        'X1Name': df['X1Name'][0],
-                        'Comment': df['Comment'][0],
-                        'History': df['History'][0]
-                }
-
-                itemDict_list.append(interpolationDict)
-
-            except:
-                msg = f"The file '{fileName}' contains an INTERPOLATION that is wrongly formatted in {sheetName} sheet."
-                QMessageBox.critical(main_window, "Load file", msg)
-                main_window.statusBar().showMessage(msg, 5000)
-                QApplication.processEvents()
+    start_io(worker, fileName + ' loading')
+
+#========================================================================================
+def load_finished(worker, result):
+
+    end_io(worker)
+    worker.result = result
 
+    while pending_loads and pending_loads[0].result is not None:
+        worker = pending_loads.pop(0)
+        add_WorkSheet(worker.fileName, *worker.result)
+
+#========================================================================================
+def add_WorkSheet(fileName, itemDict_list, messages, error=None):
 
     #--------------------------------------------------------------------
-    if len(itemDict_list) == 0:
-        msg = f"The file '{fileName}' has not been recognized as a valid PyAnalySeries worksheet."
-        QMessageBox.critical(main_window, "Load file", msg)
-        return
+    if len(itemDict_list) != 0:                             # added before the messages (modal) are shown
+        base_dir = os.getcwd()
+        relFileName = os.path.relpath(fileName, base_dir)   # get relative path
+        populate_tree_widget(relFileName, itemDict_list)
+        main_window.statusBar().showMessage(relFileName + ' loaded', 5000)
 
     #--------------------------------------------------------------------
-    base_dir = os.getcwd()
-    fileName = os.path.relpath(fileName, base_dir)          # get relative path
-    populate_tree_widget(fileName, itemDict_list)
+    for msg in messages:
+        QMessageBox.critical(main_window, "Load file", msg)
+        main_window.statusBar().showMessage(msg, 5000)
 
     #--------------------------------------------------------------------
-    main_window.statusBar().showMessage(fileName + ' loaded', 5000)
+    if len(itemDict_list) == 0:
+        msg = f"The file '{fileName}' has not been recognized as a valid PyAnalySeries worksheet."
+        if error:                                           # the file could not be read
+            msg += f"\n\n{error}"
+            main_window.statusBar().showMessage(f"{fileName}: {error}", 5000)
+        QMessageBox.critical(main_window, "Load file", msg)
 
 #========================================================================================
 def new_WorkSheet():
@@ -435,7 +414,7 @@ def open_WorkSheet():
     last_dir = settings.value("lastDir", "", type=str)
 
     filesName, _ = QFileDialog.getOpenFileNames(
-        main_window, "Open Excel File", last_dir, "Excel Files (*.xlsx)"
+        main_window, "Open Worksheet File", last_dir, "Worksheet Files (*.xlsx *.pyas);;Excel Files (*.xlsx);;Binary worksheets (*.pyas)"
     )
 
     if filesName:
@@ -446,148 +425,66 @@ def open_WorkSheet():
             print('Loading...', fileName)
             load_WorkSheet(fileName)
 
-#========================================================================================
-def autofit_columns(worksheet):
-    for col in worksheet.columns:
-        max_length = 0
-        column_letter = get_column_letter(col[0].column)
-        for cell in col:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        worksheet.column_dimensions[column_letter].width = max_length + 5 
-
 #========================================================================================
 def save_WorkSheet(ws_item):
 
     outFile = ws_item.text(0).replace(" *", "")
 
-    #-----------------------
-    try:
-        wb = Workbook()
-
-        #----------------------------------
-        sheetName = f'Information'
-        ws = wb.create_sheet(title=sheetName)
-
-        ws.cell(row=1, column=1, value=f'Created with PyAnalyseries {version}')
-
-        text = "This file has been created with PyAnalySeries software."
-        ws.cell(row=3, column=1, value=text)
-        text = "Do not modify or accordingly with documentation."
-        ws.cell(row=4, column=1, value=text)
-
-        #----------------------------------
-        for n in range(ws_item.childCount()):
-
-            item = ws_item.child(n)
-            itemDict = item.data(0, Qt.UserRole)
-
-            #-----------------------
-            if itemDict["Type"].startswith('Serie'):
-                sheetName = f'{itemDict["Type"].split(" ")[0]} {itemDict["Id"]}'
-                ws = wb.create_sheet(title=sheetName)
-
-                ws.cell(row=1, column=1, value=itemDict['X'])
-                ws.cell(row=1, column=2, value=itemDict['Y'])
-                ws.cell(row=1, column=3, value='Type')
-                ws.cell(row=1, column=4, value='Name')
-                ws.cell(row=1, column=5, value='Y axis inverted')
-                ws.cell(row=1, column=6, value='Color')
-                ws.cell(row=1, column=7, value='Comment')
-                ws.cell(row=1, column=8, value='History')
-
-                for i, (index, value) in enumerate(itemDict['Serie'].sort_index().items(), start=2):            # force sort on index
-                    ws.cell(row=i, column=1, value=index)
-                    ws.cell(row=i, column=2, value=value)
-                ws.cell(row=2, column=3, value=itemDict['Type'])
-                ws.cell(row=2, column=4, value=itemDict['Name'])
-                ws.cell(row=2, column=5, value=itemDict['Y axis inverted'])
-                ws.cell(row=2, column=6, value=itemDict['Color'])
-                ws.cell(row=2, column=7, value=itemDict['Comment'])
-                ws.cell(row=2, column=8, value=itemDict['History'])
-    
-                if 'InterpolationMode' in itemDict:
-                    ws.cell(row=1, column=9, value='InterpolationMode')
-                    ws.cell(row=1, column=10, value='X1Coords')
-                    ws.cell(row=1, column=11, value='X2Coords')
-                    ws.cell(row=1, column=12, value=itemDict['XOriginal'])
-
-                    ws.cell(row=2, column=9, value=itemDict['InterpolationMode'])
-                    for i, value in enumerate(itemDict['X1Coords'], start=2):
-                        ws.cell(row=i, column=10, value=value)
-                    for i, value in enumerate(itemDict['X2Coords'], start=2):
-                        ws.cell(row=i, column=11, value=value)
-                    for i, value in enumerate(itemDict['XOriginalValues'], start=2):
-                        ws.cell(row=i, column=12, value=value)
-
-            #-----------------------
-            elif itemDict["Type"] in ['FILTER', 'SAMPLE']:
-                sheetName = f'{itemDict["Type"]} {itemDict["Id"]}'
-                ws = wb.create_sheet(title=sheetName)
-
-                ws.cell(row=1, column=1, value='Type')
-                ws.cell(row=1, column=2, value='Name')
-                ws.cell(row=1, column=3, value='Parameters')
-                ws.cell(row=1, column=4, value='Comment')
-                ws.cell(row=1, column=5, value='History')
-                
-                ws.cell(row=2, column=1, value=itemDict['Type'])
-                ws.cell(row=2, column=2, value=itemDict['Name'])
-                ws.cell(row=2, column=3, value=itemDict['Parameters'])
-                ws.cell(row=2, column=4, value=itemDict['Comment'])
-                ws.cell(row=2, column=5, value=itemDict['History'])
-                
-            #-----------------------
-            elif itemDict["Type"] == 'INTERPOLATION':
-                sheetName = f'{itemDict["Type"]} {itemDict["Id"]}'
-                ws = wb.create_sheet(title=sheetName)
-
-                ws.cell(row=1, column=1, value='X1Coords')
-                ws.cell(row=1, column=2, value='X2Coords')
-                ws.cell(row=1, column=3, value='X1Name')
-                ws.cell(row=1, column=4, value='Type')
-                ws.cell(row=1, column=5, value='Name')
-                ws.cell(row=1, column=6, value='Comment')
-                ws.cell(row=1, column=7, value='History')
-
-                for i, value in enumerate(itemDict['X1Coords'], start=2):
-                    ws.cell(row=i, column=1, value=value)
-                for i, value in enumerate(itemDict['X2Coords'], start=2):
-                    ws.cell(row=i, column=2, value=value)
-                ws.cell(row=2, column=3, value=itemDict['X1Name'])
-                ws.cell(row=2, column=4, value=itemDict['Type'])
-                ws.cell(row=2, column=5, value=itemDict['Name'])
-                ws.cell(row=2, column=6, value=itemDict['Comment'])
-                ws.cell(row=2, column=7, value=itemDict['History'])
-                
-        if ws_item.childCount() > 0:
-            if 'Sheet' in wb.sheetnames:
-                del wb['Sheet']
-            for sheet in wb.worksheets:
-                autofit_columns(sheet)
-
-        wb.save(outFile)
-        return True 
-
-    #-----------------------
-    except:
-        return False 
+    itemDict_list = [ws_item.child(n).data(0, Qt.UserRole) for n in range(ws_item.childCount())]
+    saved_list = [itemDict.copy() for itemDict in itemDict_list]    # not changed while written
+
+    worker = saveWorkSheetWorker(outFile, saved_list, version)
+    worker.ws_item = ws_item
+    worker.items = itemDict_list
+    worker.resave = False                                   # modified and asked to be saved while saved
+    worker.signals.finished.connect(lambda worker, result: save_finished(worker, None))
+    worker.signals.error.connect(save_finished)
+    saving_ws[id(ws_item)] = worker
+
+    unmark_ws(ws_item)                                      # marked again if modified while saved
+    start_io(worker, outFile + ' saving')
 
 #========================================================================================
 def save_WorkSheets():
 
-    display_error = False
     for ws_item in tree_widget.get_parents():
         if ws_item.data(0, Qt.UserRole): 
-            outFile = ws_item.text(0).replace(" *", "")
-            if save_WorkSheet(ws_item):
-                unmark_ws(ws_item)
+            if id(ws_item) in saving_ws:
+                saving_ws[id(ws_item)].resave = True
             else:
-                main_window.statusBar().showMessage(f'Error when saving {outFile}', 5000)
-                display_error = True
+                save_WorkSheet(ws_item)
+
+#========================================================================================
+def save_finished(worker, error):
+    global exiting
+
+    end_io(worker)
+    ws_item = worker.ws_item
+    saving_ws.pop(id(ws_item), None)
+
+    if error is not None:
+        save_errors.append(worker.fileName)
+        if id(ws_item) in open_ws:
+            mark_ws(ws_item)
+    else:
+        attach_source(worker.fileName, worker.items, worker.itemDict_list)
+        if worker.resave and id(ws_item) in open_ws and ws_item.data(0, Qt.UserRole):
+            save_WorkSheet(ws_item)
 
-    if not display_error:
+    if saving_ws: return
+
+    if not save_errors:
         main_window.statusBar().showMessage('Worksheets saved', 5000)
+        if exiting: app.quit()
+        return
+
+    msg = 'Error when saving ' + ', '.join(save_errors)
+    save_errors.clear()
+    main_window.statusBar().showMessage(msg, 5000)
+    if exiting:                                             # stay open, with the worksheets not saved
+        exiting = False
+        main_window.setEnabled(True)
+        QMessageBox.critical(main_window, "Exit", msg)
 
 #========================================================================================
 def import_Data():
@@ -1424,16 +1321,38 @@ def show_dialog(title, fileHTML, width, height):
 
 #========================================================================================
 def exit_confirm():
-
-    reply = QMessageBox.question(
-        main_window, 
-        "Exit confirmation",
-        "Are you sure you want to exit the application ?",
-        QMessageBox.Yes | QMessageBox.No,
-        QMessageBox.No
-    )
+    global exiting
+
+    modified = [ws_item for ws_item in tree_widget.get_parents() if ws_item.data(0, Qt.UserRole)]
+
+    if modified:
+        reply = QMessageBox.question(
+            main_window, 
+            "Exit confirmation",
+            "Some worksheets have been modified. Do you want to save them before exiting the application ?",
+            QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel,
+            QMessageBox.Cancel
+        )
+    else:
+        reply = QMessageBox.question(
+            main_window, 
+            "Exit confirmation",
+            "Are you sure you want to exit the application ?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
     
-    if reply == QMessageBox.Yes:
+    if reply in (QMessageBox.No, QMessageBox.Cancel):
+        return
+
+    if reply == QMessageBox.Save:
+        save_WorkSheets()
+
+    if saving_ws:                                           # quit by save_finished, the saves being done
+        exiting = True
+        main_window.setEnabled(False)
+        main_window.statusBar().showMessage('Saving worksheets before exiting')
+    else:
         app.quit()
 
 #========================================================================================
@@ -1444,176 +1363,190 @@ def close_event(event):
         event.ignore()
 
 #========================================================================================
-app = QApplication(sys.argv)
-
-app_dir = Path(__file__).resolve().parent
-
-fontArial = QFont('Arial', 12)
-app.setFont(fontArial)
-
-icon = QIcon(str(app_dir / 'resources' / 'PyAnalySeries_icon.png'))
-app.setWindowIcon(icon)
-
-main_window = QMainWindow()
-main_window.setWindowTitle(f"PyAnalySeries {version}")
-main_window.setGeometry(100, 100, 1400, 600)
-
-main_widget = QWidget()
-layout = QVBoxLayout()
-
-tree_widget = create_tree_widget()
-tree_widget.setContextMenuPolicy(Qt.CustomContextMenu)
-tree_widget.customContextMenuRequested.connect(show_context_menu)
-tree_widget.itemChanged.connect(on_item_changed)
-tree_widget.itemDoubleClicked.connect(on_item_double_clicked)
-
-layout.addWidget(tree_widget)
-
-main_widget.setLayout(layout)
-main_window.setCentralWidget(main_widget)
-
-menu_bar = main_window.menuBar()
-
-#----------------------------------------------
-file_menu = menu_bar.addMenu("File")
-
-newWS_action = QAction("New worksheet", main_window)
-newWS_action.setShortcut('Ctrl+n')
-newWS_action.triggered.connect(new_WorkSheet)
-openWS_action = QAction("Open worksheet(s)", main_window)
-openWS_action.setShortcut('Ctrl+o')
-openWS_action.triggered.connect(open_WorkSheet)
-saveWSs_action = QAction("Save worksheets", main_window)
-saveWSs_action.setShortcut('Ctrl+s')
-saveWSs_action.triggered.connect(save_WorkSheets)
-exit_action = QAction('Exit', main_window)
-exit_action.setShortcut('q')
-exit_action.triggered.connect(exit_confirm)
-
-file_menu.addAction(newWS_action)
-file_menu.addAction(openWS_action)
-file_menu.addAction(saveWSs_action)
-file_menu.addSeparator()
-file_menu.addAction(exit_action)
-
-#----------------------------------------------
-edit_menu = menu_bar.addMenu("Edit")
-
-cut_action = QAction("Cut", main_window)
-#cut_action.setShortcuts([QKeySequence("Ctrl+x"), QKeySequence(Qt.Key_Delete)])
-cut_action.setShortcut(QKeySequence("Ctrl+x"))
-cut_action.triggered.connect(cut_items)
-
-copy_action = QAction("Copy", main_window)
-copy_action.setShortcut(QKeySequence("Ctrl+c"))
-copy_action.triggered.connect(copy_items)
-
-paste_action = QAction("Paste", main_window)
-paste_action.setShortcut(QKeySequence("Ctrl+v"))
-paste_action.triggered.connect(paste_items)
-
-display_action = QAction("Display Single", main_window)
-display_action.setShortcut('Ctrl+d')
-display_action.triggered.connect(displaySingleSerie_selected_series)
-
-displayTogetherSeries_action = QAction("Display Together", main_window)
-displayTogetherSeries_action.setShortcut('Ctrl+t')
-displayTogetherSeries_action.triggered.connect(lambda: displayMultipleSeries_selected_series(overlaid=True))
-
-displayStackedSeries_action = QAction("Display Stacked", main_window)
-displayStackedSeries_action.setShortcut('Ctrl+k')
-displayStackedSeries_action.triggered.connect(lambda: displayMultipleSeries_selected_series(overlaid=False))
-
-close_all_action = QAction("Close all Display windows")
-close_all_action.triggered.connect(close_all_windows)
-
-edit_menu.addAction(cut_action)
-edit_menu.addAction(copy_action)
-edit_menu.addAction(paste_action)
-edit_menu.addSeparator()
-edit_menu.addAction(display_action)
-edit_menu.addAction(displayTogetherSeries_action)
-edit_menu.addAction(displayStackedSeries_action)
-edit_menu.addAction(close_all_action)
-
-#----------------------------------------------
-create_menu = menu_bar.addMenu("Create")
-
-importData_action = QAction("Import data", main_window)
-importData_action.setShortcut('Ctrl+m')
-importData_action.triggered.connect(import_Data)
-
-randomSerie_action = QAction("Random serie", main_window)
-randomSerie_action.triggered.connect(define_randomSerie)
-insolationAstroSerie_action = QAction("Insolation / Astronomical serie", main_window)
-insolationAstroSerie_action.triggered.connect(define_insolationAstroSerie)
-
-create_menu.addAction(importData_action)
-create_menu.addSeparator()
-create_menu.addAction(randomSerie_action)
-create_menu.addSeparator()
-create_menu.addAction(insolationAstroSerie_action)
-
-#----------------------------------------------
-process_menu = menu_bar.addMenu("Process")
-
-defineFilter_action = QAction("Define Filter smoothing average", main_window)
-defineFilter_action.setShortcut('Ctrl+f')
-defineFilter_action.triggered.connect(define_filter)
-applyFilter_action = QAction("Apply Filter smoothing average", main_window)
-applyFilter_action.triggered.connect(apply_filter)
-
-defineSample_action = QAction('Define Sampling', main_window)
-defineSample_action.setShortcut('Ctrl+a')
-defineSample_action.triggered.connect(define_sample)
-applySample_action = QAction("Apply Sampling", main_window)
-applySample_action.triggered.connect(apply_sample)
-
-defineInterpolation_action = QAction("Define Interpolation", main_window)
-defineInterpolation_action.setShortcut('Ctrl+i')
-defineInterpolation_action.triggered.connect(define_interpolation)
-applyInterpolationLinear_action = QAction("Apply Interpolation linear", main_window)
-applyInterpolationLinear_action.triggered.connect(lambda: apply_interpolation('Linear'))
-applyInterpolationPCHIP_action = QAction("Apply Interpolation PCHIP", main_window)
-applyInterpolationPCHIP_action.setToolTip("This action applies PCHIP interpolation to the selected data.")
-applyInterpolationPCHIP_action.triggered.connect(lambda: apply_interpolation('PCHIP'))
-
-process_menu.addAction(defineFilter_action)
-process_menu.addAction(applyFilter_action)
-process_menu.addSeparator()
-process_menu.addAction(defineSample_action)
-process_menu.addAction(applySample_action)
-process_menu.addSeparator()
-process_menu.addAction(defineInterpolation_action)
-process_menu.addAction(applyInterpolationLinear_action)
-process_menu.addAction(applyInterpolationPCHIP_action)
-
-#----------------------------------------------
-help_menu = menu_bar.addMenu('Help')
-
-help_action = QAction('Help', main_window)
-help_action.triggered.connect(lambda: show_dialog('Help', app_dir / 'resources' / 'help.html', 1000, 800))
-help_menu.addAction(help_action)
-
-#----------------------------------------------
-about_menu = menu_bar.addMenu('About')
-
-about_action = QAction('About', main_window)
-about_action.triggered.connect(lambda: show_dialog('About', app_dir / 'resources' / 'about.html', 1000, 600))
-about_menu.addAction(about_action)
-
-#----------------------------------------------
-if filesName:
-    for fileName in filesName: 
-        print('Loading...', fileName)
-        load_WorkSheet(fileName)
-
-#----------------------------------------------
-main_window.setStatusBar(QStatusBar())
-main_window.statusBar().showMessage('Application ready', 5000)
-main_window.show()
-
-main_window.closeEvent = close_event
-
-sys.exit(app.exec_())
+# guarded: worker processes (insolation computations) import this script without running the application
+if __name__ == '__main__':
+
+    app = QApplication(sys.argv)
+
+    app_dir = Path(__file__).resolve().parent
+
+    fontArial = QFont('Arial', 12)
+    app.setFont(fontArial)
+
+    icon = QIcon(str(app_dir / 'resources' / 'PyAnalySeries_icon.png'))
+    app.setWindowIcon(icon)
+
+    main_window = QMainWindow()
+    main_window.setWindowTitle(f"PyAnalySeries {version}")
+    main_window.setGeometry(100, 100, 1400, 600)
+
+    main_widget = QWidget()
+    layout = QVBoxLayout()
+
+    tree_widget = create_tree_widget()
+    tree_widget.setContextMenuPolicy(Qt.CustomContextMenu)
+    tree_widget.customContextMenuRequested.connect(show_context_menu)
+    tree_widget.itemChanged.connect(on_item_changed)
+    tree_widget.itemDoubleClicked.connect(on_item_double_clicked)
+
+    lazy_signals = lazyItemSignals()
+    lazy_signals.loaded.connect(update_serie_icon)
+    LazyItemDict.on_load = lazy_signals.loaded.emit            # series possibly read by a save, out of the GUI thread
+
+    layout.addWidget(tree_widget)
+
+    main_widget.setLayout(layout)
+    main_window.setCentralWidget(main_widget)
+
+    menu_bar = main_window.menuBar()
+
+    #----------------------------------------------
+    file_menu = menu_bar.addMenu("File")
+
+    newWS_action = QAction("New worksheet", main_window)
+    newWS_action.setShortcut('Ctrl+n')
+    newWS_action.triggered.connect(new_WorkSheet)
+    openWS_action = QAction("Open worksheet(s)", main_window)
+    openWS_action.setShortcut('Ctrl+o')
+    openWS_action.triggered.connect(open_WorkSheet)
+    saveWSs_action = QAction("Save worksheets", main_window)
+    saveWSs_action.setShortcut('Ctrl+s')
+    saveWSs_action.triggered.connect(save_WorkSheets)
+    exit_action = QAction('Exit', main_window)
+    exit_action.setShortcut('q')
+    exit_action.triggered.connect(exit_confirm)
+
+    file_menu.addAction(newWS_action)
+    file_menu.addAction(openWS_action)
+    file_menu.addAction(saveWSs_action)
+    file_menu.addSeparator()
+    file_menu.addAction(exit_action)
+
+    #----------------------------------------------
+    edit_menu = menu_bar.addMenu("Edit")
+
+    cut_action = QAction("Cut", main_window)
+    #cut_action.setShortcuts([QKeySequence("Ctrl+x"), QKeySequence(Qt.Key_Delete)])
+    cut_action.setShortcut(QKeySequence("Ctrl+x"))
+    cut_action.triggered.connect(cut_items)
+
+    copy_action = QAction("Copy", main_window)
+    copy_action.setShortcut(QKeySequence("Ctrl+c"))
+    copy_action.triggered.connect(copy_items)
+
+    paste_action = QAction("Paste", main_window)
+    paste_action.setShortcut(QKeySequence("Ctrl+v"))
+    paste_action.triggered.connect(paste_items)
+
+    display_action = QAction("Display Single", main_window)
+    display_action.setShortcut('Ctrl+d')
+    display_action.triggered.connect(displaySingleSerie_selected_series)
+
+    displayTogetherSeries_action = QAction("Display Together", main_window)
+    displayTogetherSeries_action.setShortcut('Ctrl+t')
+    displayTogetherSeries_action.triggered.connect(lambda: displayMultipleSeries_selected_series(overlaid=True))
+
+    displayStackedSeries_action = QAction("Display Stacked", main_window)
+    displayStackedSeries_action.setShortcut('Ctrl+k')
+    displayStackedSeries_action.triggered.connect(lambda: displayMultipleSeries_selected_series(overlaid=False))
+
+    close_all_action = QAction("Close all Display windows")
+    close_all_action.triggered.connect(close_all_windows)
+
+    edit_menu.addAction(cut_action)
+    edit_menu.addAction(copy_action)
+    edit_menu.addAction(paste_action)
+    edit_menu.addSeparator()
+    edit_menu.addAction(display_action)
+    edit_menu.addAction(displayTogetherSeries_action)
+    edit_menu.addAction(displayStackedSeries_action)
+    edit_menu.addAction(close_all_action)
+
+    #----------------------------------------------
+    create_menu = menu_bar.addMenu("Create")
+
+    importData_action = QAction("Import data", main_window)
+    importData_action.setShortcut('Ctrl+m')
+    importData_action.triggered.connect(import_Data)
+
+    randomSerie_action = QAction("Random serie", main_window)
+    randomSerie_action.triggered.connect(define_randomSerie)
+    insolationAstroSerie_action = QAction("Insolation / Astronomical serie", main_window)
+    insolationAstroSerie_action.triggered.connect(define_insolationAstroSerie)
+
+    create_menu.addAction(importData_action)
+    create_menu.addSeparator()
+    create_menu.addAction(randomSerie_action)
+    create_menu.addSeparator()
+    create_menu.addAction(insolationAstroSerie_action)
+
+    #----------------------------------------------
+    process_menu = menu_bar.addMenu("Process")
+
+    defineFilter_action = QAction("Define Filter smoothing average", main_window)
+    defineFilter_action.setShortcut('Ctrl+f')
+    defineFilter_action.triggered.connect(define_filter)
+    applyFilter_action = QAction("Apply Filter smoothing average", main_window)
+    applyFilter_action.triggered.connect(apply_filter)
+
+    defineSample_action = QAction('Define Sampling', main_window)
+    defineSample_action.setShortcut('Ctrl+a')
+    defineSample_action.triggered.connect(define_sample)
+    applySample_action = QAction("Apply Sampling", main_window)
+    applySample_action.triggered.connect(apply_sample)
+
+    defineInterpolation_action = QAction("Define Interpolation", main_window)
+    defineInterpolation_action.setShortcut('Ctrl+i')
+    defineInterpolation_action.triggered.connect(define_interpolation)
+    applyInterpolationLinear_action = QAction("Apply Interpolation linear", main_window)
+    applyInterpolationLinear_action.triggered.connect(lambda: apply_interpolation('Linear'))
+    applyInterpolationPCHIP_action = QAction("Apply Interpolation PCHIP", main_window)
+    applyInterpolationPCHIP_action.setToolTip("This action applies PCHIP interpolation to the selected data.")
+    applyInterpolationPCHIP_action.triggered.connect(lambda: apply_interpolation('PCHIP'))
+
+    process_menu.addAction(defineFilter_action)
+    process_menu.addAction(applyFilter_action)
+    process_menu.addSeparator()
+    process_menu.addAction(defineSample_action)
+    process_menu.addAction(applySample_action)
+    process_menu.addSeparator()
+    process_menu.addAction(defineInterpolation_action)
+    process_menu.addAction(applyInterpolationLinear_action)
+    process_menu.addAction(applyInterpolationPCHIP_action)
+
+    #----------------------------------------------
+    help_menu = menu_bar.addMenu('Help')
+
+    help_action = QAction('Help', main_window)
+    help_action.triggered.connect(lambda: show_dialog('Help', app_dir / 'resources' / 'help.html', 1000, 800))
+    help_menu.addAction(help_action)
+
+    #----------------------------------------------
+    about_menu = menu_bar.addMenu('About')
+
+    about_action = QAction('About', main_window)
+    about_action.triggered.connect(lambda: show_dialog('About', app_dir / 'resources' / 'about.html', 1000, 600))
+    about_menu.addAction(about_action)
+
+    #----------------------------------------------
+    main_window.setStatusBar(QStatusBar())
+    main_window.statusBar().showMessage('Application ready', 5000)
+
+    io_progress_bar = QProgressBar()
+    io_progress_bar.setRange(0, 100)
+    io_progress_bar.setFixedWidth(200)
+    io_progress_bar.hide()
+    main_window.statusBar().addPermanentWidget(io_progress_bar)
+
+    #----------------------------------------------
+    if filesName:
+        for fileName in filesName: 
+            print('Loading...', fileName)
+            load_WorkSheet(fileName)
+
+    #----------------------------------------------
+    main_window.show()
+
+    main_window.closeEvent = close_event
 
+    sys.exit(app.exec_())
@@ -3,6 +3,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
 import sys
+import os
+import threading
 import pandas as pd
 import numpy as np
 
@@ -16,6 +18,9 @@ from .interactivePlot import interactivePlot
 
 from .insolation import inso
 from .insolation import astro
+from .insolation import series
+from .insolation import cache
+from .insolation import preview
 
 #=========================================================================================
 for key in plt.rcParams.keys():
@@ -52,27 +57,14 @@ class defineInsolationAstroSerieWindow(QWidget):
         #-------------------------------
         # Insolation type dropdown
         self.plotType_dropdown = QComboBox()
-        self.plotType_dropdown.addItems([
-            "Eccentricity",
-            "Obliquity",
-            "Precession angle",
-            "Precession parameter",
-            "Daily insolation",
-            "Integrated insolation between 2 true longitudes",
-            "Caloric summer insolation",
-            "Caloric winter insolation"
-        ])
+        self.plotType_dropdown.addItems(list(series.quantities))
         self.plotType_dropdown.insertSeparator(4)
         self.plotType_dropdown.setCurrentText("Daily insolation")
 
         #-------------------------------
         # Astronomical solution dropdown
         self.solutionAstro_dropdown = QComboBox()
-        self.solutionAstro_dropdown.addItems(["Berger1978", 
-                                              "Laskar1993_01", "Laskar1993_11", 
-                                              "Laskar2004",
-                                              "Laskar2010a", "Laskar2010b", "Laskar2010c", "Laskar2010d", 
-                                              ])
+        self.solutionAstro_dropdown.addItems(list(astro.solutions))
         self.solutionAstro_dropdown.setCurrentText("Laskar2004")
         
         #-------------------------------
@@ -104,6 +96,35 @@ class defineInsolationAstroSerieWindow(QWidget):
         self.trueLongitude2_input.setValue(180)
         self.trueLongitude2_input.setSingleStep(5)
 
+        #-------------------------------
+        # Calendar day (1 = January 1st, spring equinox on March 21st = day 80)
+        self.day_input = QSpinBox()
+        self.day_input.setRange(1, 365)
+        self.day_input.setValue(172)
+        self.day_input.setSingleStep(1)
+        self.day_input.setToolTip("Day of the year, 1 = January 1st, 172 = June 21st (spring equinox on March 21st)")
+
+        #-------------------------------
+        # Threshold of the summer energy
+        self.threshold_input = QSpinBox()
+        self.threshold_input.setRange(0, 1000)
+        self.threshold_input.setValue(275)
+        self.threshold_input.setSingleStep(5)
+        self.threshold_input.setToolTip("Dayly insolation above which the energy is counted (Huybers, 2006)")
+
+        #-------------------------------
+        # Latitude #2 of the gradient or of the latitude band
+        self.latitude2_input = QSpinBox()
+        self.latitude2_input.setRange(-90, 90)
+        self.latitude2_input.setValue(25)
+        self.latitude2_input.setSingleStep(5)
+
+        #-------------------------------
+        # Month
+        self.month_dropdown = QComboBox()
+        self.month_dropdown.addItems(series.months)
+        self.month_dropdown.setCurrentIndex(5)
+
         #-------------------------------
         # Time direction
         self.timeConvention_dropdown = QComboBox()
@@ -139,6 +160,25 @@ class defineInsolationAstroSerieWindow(QWidget):
         self.tstep_input.setDecimals(3)
         self.tstep_input.setToolTip(f"Choose a value between {lim1Step} and {lim2Step}")
 
+        #-------------------------------
+        # Parallel computation (1 worker = serial)
+        self.workers_input = QSpinBox()
+        self.workers_input.setRange(1, os.cpu_count() or 1)
+        self.workers_input.setValue(1)
+        self.workers_input.setToolTip("Number of processes sharing the time axis (1 = serial)")
+
+        self.chunkSize_input = QSpinBox()
+        self.chunkSize_input.setRange(1000, 1000000)
+        self.chunkSize_input.setValue(series.default_chunk_size)
+        self.chunkSize_input.setSingleStep(1000)
+        self.chunkSize_input.setToolTip("Number of time steps computed by each task")
+
+        #-------------------------------
+        # Fast preview from tabulated insolation (the exact values are computed on import)
+        self.preview_checkbox = QCheckBox()
+        self.preview_checkbox.setChecked(False)
+        self.preview_checkbox.setToolTip("Interpolate tabulated insolation while the parameters change; the imported serie is always computed exactly")
+
         #-------------------------------
         self.timeUnit_dropdown = QComboBox()
         self.timeUnit_dropdown.addItems([
@@ -155,6 +195,10 @@ class defineInsolationAstroSerieWindow(QWidget):
         form_layout.addRow("Latitude [°] :", self.latitude_input)
         form_layout.addRow("True longitude #1 [°] :", self.trueLongitude1_input)
         form_layout.addRow("True longitude #2 [°] :", self.trueLongitude2_input)
+        form_layout.addRow("Calendar day :", self.day_input)
+        form_layout.addRow("Month :", self.month_dropdown)
+        form_layout.addRow("Threshold [W/m2] :", self.threshold_input)
+        form_layout.addRow("Latitude #2 [°] :", self.latitude2_input)
         form_layout.addRow("Time direction :", self.timeConvention_dropdown)
         form_layout.addRow("Time unit:", self.timeUnit_dropdown)
         self.label_tstart = QLabel(f"Start [{self.timeUnit}] :")
@@ -163,6 +207,9 @@ class defineInsolationAstroSerieWindow(QWidget):
         form_layout.addRow(self.label_tend, self.tend_input)
         self.label_tstep = QLabel(f"Step [{self.timeUnit}] :")
         form_layout.addRow(self.label_tstep, self.tstep_input)
+        form_layout.addRow("Parallel workers :", self.workers_input)
+        form_layout.addRow("Chunk size :", self.chunkSize_input)
+        form_layout.addRow("Fast preview :", self.preview_checkbox)
 
         #-------------------------------
         groupbox1.setLayout(form_layout)
@@ -206,6 +253,10 @@ class defineInsolationAstroSerieWindow(QWidget):
         main_layout.addLayout(col_layout)
 
         #----------------------------------------------
+        self.computed = None
+        self.computed_values = None
+        self.worker = None
+
         self.update_timer = QTimer()
         self.update_timer.setSingleShot(True)
         self.update_timer.timeout.connect(self.myplot)
@@ -219,10 +270,17 @@ class defineInsolationAstroSerieWindow(QWidget):
         self.latitude_input.valueChanged.connect(self.delayed_update)
         self.trueLongitude1_input.valueChanged.connect(self.delayed_update)
         self.trueLongitude2_input.valueChanged.connect(self.delayed_update)
+        self.day_input.valueChanged.connect(self.delayed_update)
+        self.month_dropdown.currentIndexChanged.connect(self.delayed_update)
+        self.threshold_input.valueChanged.connect(self.delayed_update)
+        self.latitude2_input.valueChanged.connect(self.delayed_update)
         self.tstart_input.valueChanged.connect(self.delayed_update)
         self.tend_input.valueChanged.connect(self.delayed_update)
         self.tstep_input.valueChanged.connect(self.delayed_update)
+        self.workers_input.valueChanged.connect(self.delayed_update)
+        self.chunkSize_input.valueChanged.connect(self.delayed_update)
         self.timeConvention_dropdown.currentIndexChanged.connect(self.delayed_update)
+        self.preview_checkbox.stateChanged.connect(self.delayed_update)
 
         #----------------------------------------------
         self.interactive_plot = interactivePlot()
@@ -238,8 +296,13 @@ class defineInsolationAstroSerieWindow(QWidget):
         self.import_button.setStyleSheet(style)
         self.close_button = QPushButton("Close", self)
         self.close_button.setStyleSheet(style)
+        self.cancel_button = QPushButton("Cancel", self)
+        self.cancel_button.setStyleSheet(style)
+        self.cancel_button.setEnabled(False)
         button_layout.addStretch()
 
+        button_layout.addWidget(self.cancel_button)
+        button_layout.addSpacing(50)
         button_layout.addWidget(self.import_button)
         button_layout.addSpacing(50)
         button_layout.addWidget(self.close_button)
@@ -247,11 +310,18 @@ class defineInsolationAstroSerieWindow(QWidget):
 
         self.import_button.clicked.connect(self.import_serie)
         self.close_button.clicked.connect(self.close)
+        self.cancel_button.clicked.connect(self.cancel_computation)
 
         self.status_bar = QStatusBar()
         self.status_bar.setFixedHeight(20)
         main_layout.addWidget(self.status_bar)
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedWidth(200)
+        self.progress_bar.hide()
+        self.status_bar.addPermanentWidget(self.progress_bar)
+
         #----------------------------------------------
         self.setLayout(main_layout)
 
@@ -355,26 +425,15 @@ class defineInsolationAstroSerieWindow(QWidget):
 
         self.plotType = self.plotType_dropdown.currentText()
 
-        if self.plotType in ["Eccentricity", "Obliquity", "Precession angle", "Precession parameter"]:
-            self.solar_constant_input.setEnabled(False)
-            self.latitude_input.setEnabled(False)
-            self.trueLongitude1_input.setEnabled(False)
-            self.trueLongitude2_input.setEnabled(False)
-        if self.plotType == "Daily insolation":
-            self.solar_constant_input.setEnabled(True)
-            self.latitude_input.setEnabled(True)
-            self.trueLongitude1_input.setEnabled(True)
-            self.trueLongitude2_input.setEnabled(False)
-        elif self.plotType == "Integrated insolation between 2 true longitudes":
-            self.solar_constant_input.setEnabled(True)
-            self.latitude_input.setEnabled(True)
-            self.trueLongitude1_input.setEnabled(True)
-            self.trueLongitude2_input.setEnabled(True)
-        elif self.plotType in ["Caloric summer insolation", "Caloric winter insolation"]:
-            self.solar_constant_input.setEnabled(True)
-            self.latitude_input.setEnabled(True)
-            self.trueLongitude1_input.setEnabled(False)
-            self.trueLongitude2_input.setEnabled(False)
+        used = series.quantity_parameters.get(self.plotType, ())
+        self.solar_constant_input.setEnabled("solar_constant" in used)
+        self.latitude_input.setEnabled("latitude" in used)
+        self.trueLongitude1_input.setEnabled("trueLongitude1" in used)
+        self.trueLongitude2_input.setEnabled("trueLongitude2" in used)
+        self.day_input.setEnabled("day" in used)
+        self.month_dropdown.setEnabled("month" in used)
+        self.threshold_input.setEnabled("threshold" in used)
+        self.latitude2_input.setEnabled("latitude2" in used)
 
         self.delayed_update()
 
@@ -382,8 +441,17 @@ class defineInsolationAstroSerieWindow(QWidget):
     def solutionAstro_change(self):
 
         def reinit_plotType_dropdow():
+            # only the quantities that the solution can give are selectable
+            available = series.available_quantities(self.solutionAstro)
             for i in range(self.plotType_dropdown.count()):
-                self.plotType_dropdown.setItemData(i, Qt.ItemIsEnabled | Qt.ItemIsSelectable, Qt.UserRole - 1)
+                if self.plotType_dropdown.itemText(i) not in series.quantities:      # separator
+                    continue
+                if self.plotType_dropdown.itemText(i) in available:
+                    self.plotType_dropdown.setItemData(i, Qt.ItemIsEnabled | Qt.ItemIsSelectable, Qt.UserRole - 1)
+                else:
+                    self.plotType_dropdown.setItemData(i, Qt.NoItemFlags, Qt.UserRole - 1)
+            if self.plotType_dropdown.currentText() not in available:
+                self.plotType_dropdown.setCurrentText(available[0])
 
         self.solutionAstro = self.solutionAstro_dropdown.currentText()
 
@@ -392,34 +460,27 @@ class defineInsolationAstroSerieWindow(QWidget):
         else:
             scaleFactor = 1
 
+        reinit_plotType_dropdow()
+
         if self.solutionAstro.startswith("Laskar2010"):
-            for i in range(self.plotType_dropdown.count()):
-                if self.plotType_dropdown.itemText(i) != "Eccentricity":
-                    self.plotType_dropdown.model().item(i).setFlags(Qt.NoItemFlags)
-                else:
-                    self.plotType_dropdown.model().item(i).setFlags(Qt.ItemIsEnabled)
-            self.plotType_dropdown.setCurrentText("Eccentricity")
             lim1 = -249999
             lim2 = 0
             refText = self.ref_Laskar2010
             rangeText = self.range_Laskar2010
 
         elif self.solutionAstro.startswith("Laskar2004"):
-            reinit_plotType_dropdow()
             lim1 = -101000
             lim2 = 21000 
             refText = self.ref_Laskar2004
             rangeText = self.range_Laskar2004
 
         elif self.solutionAstro.startswith("Laskar1993"):
-            reinit_plotType_dropdow()
             lim1 = -20000
             lim2 = 10000 
             refText = self.ref_Laskar1993
             rangeText = self.range_Laskar1993
 
         else:
-            reinit_plotType_dropdow()
             lim1 = -5E6
             lim2 = 5E6
             refText = self.ref_Berger1978
@@ -438,19 +499,16 @@ class defineInsolationAstroSerieWindow(QWidget):
 
     #---------------------------------------------------------------------------------------------
     def delayed_update(self):
+        self.cancel_computation()                       # its result would be stale
+        if self.preview_checkbox.isChecked():
+            self.update_timer.start(100)                # a burst of changes gives one preview
+            return
         self.status_bar.showMessage('Waiting', 1000)
         self.update_timer.start(1000)
 
     #---------------------------------------------------------------------------------------------
-    def myplot(self):
-
-        self.plotType = self.plotType_dropdown.currentText()
-        self.solutionAstro = self.solutionAstro_dropdown.currentText()
+    def serie_parameters(self):
 
-        solar_constant = self.solar_constant_input.value()
-        latitude = self.latitude_input.value()
-        trueLongitude1 = self.trueLongitude1_input.value()
-        trueLongitude2 = self.trueLongitude2_input.value()
         t_start = self.tstart_input.value()
         t_end = self.tend_input.value()
         t_step = self.tstep_input.value()
@@ -459,95 +517,154 @@ class defineInsolationAstroSerieWindow(QWidget):
 
         if self.timeUnit == 'yr': t = t/1000
 
-        deg_to_rad = np.pi/180.
-       
-        astro_params = eval(f"astro.Astro{self.solutionAstro}()")
-
-        values = np.empty(len(t))
-
-        piDeg = np.pi/180
-
-        if self.plotType == "Eccentricity":
-            ecc = astro_params.eccentricity(t)
-            values = ecc / piDeg
-            ylabel = "Eccentricity [degrees]"
-
-        elif self.plotType == "Obliquity":
-            obl = astro_params.obliquity(t)
-            values = obl / piDeg
-            ylabel = "Obliquity [degrees]"
-
-        elif self.plotType == "Precession angle":
-            pre = astro_params.precession_angle(t)
-            values = pre / piDeg
-            ylabel = "Precession angle [degrees]"
-
-        elif self.plotType == "Precession parameter":
-            preParam = astro_params.precession_parameter(t)
-            values = preParam / piDeg
-            ylabel = "Precession parameter [degrees]"
-
-        elif self.plotType == "Daily insolation":
-            ecc = astro_params.eccentricity(t)
-            obl = astro_params.obliquity(t)
-            pre = astro_params.precession_angle(t)
-            for i in range(len(t)): 
-                values[i] = solar_constant * \
-                            inso.inso_dayly_radians(
-                                    trueLongitude1*deg_to_rad,
-                                    latitude*deg_to_rad, 
-                                    obl[i], 
-                                    ecc[i], 
-                                    pre[i])
-            ylabel = "Insolation [W/m2]"
-
-        elif self.plotType == "Integrated insolation between 2 true longitudes":
-            ecc = astro_params.eccentricity(t)
-            obl = astro_params.obliquity(t)
-            pre = astro_params.precession_angle(t)
-            for i in range(len(t)): 
-                values[i] = solar_constant * \
-                            inso.inso_mean_radians(
-                                    trueLongitude1*deg_to_rad,
-                                    trueLongitude2*deg_to_rad,
-                                    latitude*deg_to_rad, 
-                                    obl[i], 
-                                    ecc[i], 
-                                    pre[i])
-            ylabel = "Insolation [W/m2]"
-
-        elif self.plotType == "Caloric summer insolation":
-            ecc = astro_params.eccentricity(t)
-            obl = astro_params.obliquity(t)
-            pre = astro_params.precession_angle(t)
-            for i in range(len(t)): 
-                values[i] = solar_constant * \
-                            inso.inso_caloric_summer_NH(
-                                                    latitude*deg_to_rad, 
-                                                    obl[i], 
-                                                    ecc[i], 
-                                                    pre[i])
-            ylabel = "Insolation [W/m2]"
-
-        elif self.plotType == "Caloric winter insolation":
-            ecc = astro_params.eccentricity(t)
-            obl = astro_params.obliquity(t)
-            pre = astro_params.precession_angle(t)
-            for i in range(len(t)): 
-                values[i] = solar_constant * \
-                            inso.inso_caloric_winter_NH(
-                                                    latitude*deg_to_rad, 
-                                                    obl[i], 
-                                                    ecc[i], 
-                                                    pre[i])
-            ylabel = "Insolation [W/m2]"
+        parameters = {
+            'solar_constant': self.solar_constant_input.value(),
+            'latitude': self.latitude_input.value(),
+            'trueLongitude1': self.trueLongitude1_input.value(),
+            'trueLongitude2': self.trueLongitude2_input.value(),
+            'day': self.day_input.value(),
+            'month': self.month_dropdown.currentIndex() + 1,
+            'threshold': self.threshold_input.value(),
+            'latitude2': self.latitude2_input.value(),
+            }
+
+        return t, parameters
 
-        if self.timeUnit == 'yr':
-            self.index = t * self.t_convention * 1000
-        else:
-            self.index = t * self.t_convention
+    #---------------------------------------------------------------------------------------------
+    def current_request(self):
+
+        self.plotType = self.plotType_dropdown.currentText()
+        self.solutionAstro = self.solutionAstro_dropdown.currentText()
+
+        t, parameters = self.serie_parameters()
+
+        return (self.solutionAstro, self.plotType, self.timeUnit, self.t_convention, t, parameters)
+
+    #---------------------------------------------------------------------------------------------
+    def is_same_serie(self, request):
+
+        return self.computed is not None and self.computed[:4] == request[:4] and self.computed[5] == request[5]
+
+    #---------------------------------------------------------------------------------------------
+    def is_computed(self, request):
+
+        return self.is_same_serie(request) and np.array_equal(self.computed[4], request[4])
+
+    #---------------------------------------------------------------------------------------------
+    def start_computation(self, request, then_import=False):
+
+        self.cancel_computation()
+
+        # only the time grid changed: the previous values are spliced, only new steps are computed
+        previous = None
+        if self.is_same_serie(request):
+            previous = (self.computed[4], self.computed_values)
+
+        worker = serieWorker(request, previous, self.workers_input.value(), self.chunkSize_input.value())
+        worker.then_import = then_import
+        worker.signals.progress.connect(self.computation_progress)
+        worker.signals.finished.connect(self.computation_finished)
+        worker.signals.error.connect(self.computation_error)
+        self.worker = worker
+
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.cancel_button.setEnabled(True)
+        self.status_bar.showMessage('Computing...')
+
+        QThreadPool.globalInstance().start(worker)
+
+    #---------------------------------------------------------------------------------------------
+    def cancel_computation(self):
+
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+            self.status_bar.showMessage('Cancelled', 1000)
+        self.progress_bar.hide()
+        self.cancel_button.setEnabled(False)
+
+    #---------------------------------------------------------------------------------------------
+    def computation_progress(self, worker, percent):
+
+        if worker is self.worker:
+            self.progress_bar.setValue(percent)
+
+    #---------------------------------------------------------------------------------------------
+    def computation_error(self, worker, message):
+
+        if worker is self.worker:
+            self.worker = None
+            self.progress_bar.hide()
+            self.cancel_button.setEnabled(False)
+            self.status_bar.showMessage(f'Error: {message}', 5000)
+
+    #---------------------------------------------------------------------------------------------
+    def computation_finished(self, worker, values, hit):
+
+        if worker is not self.worker:                   # stale computation
+            return
+        self.worker = None
+        self.progress_bar.hide()
+        self.cancel_button.setEnabled(False)
+
+        self.computed = worker.request
+        self.computed_values = values
+
+        self.index = self.serie_index(worker.request)
         self.values = values
 
+        self.plot(worker.request)
+        self.status_bar.showMessage(f"Updated (cache {'hit' if hit else 'miss'} - {cache.cache.hits} hits / {cache.cache.misses} misses)", 3000)
+
+        if worker.then_import:
+            self.add_serie()
+
+    #---------------------------------------------------------------------------------------------
+    def myplot(self):
+
+        if self.preview_checkbox.isChecked():
+            self.preview_plot()
+        else:
+            self.start_computation(self.current_request())
+
+    #---------------------------------------------------------------------------------------------
+    def preview_plot(self):
+
+        request = self.current_request()
+        solutionAstro, plotType, timeUnit, t_convention, t, parameters = request
+
+        try:
+            self.values, error = preview.compute_serie(solutionAstro, plotType, t, exact=False, **parameters)
+        except preview.NotTabulated:                    # exact values only, out of the GUI thread
+            self.start_computation(request)
+            return
+        except ValueError as e:                         # time out of the table of the solution
+            self.status_bar.showMessage(f'Error: {e}', 5000)
+            return
+        self.index = self.serie_index(request)
+
+        self.plot(request)
+        if error > 0:
+            self.status_bar.showMessage(f'Preview (error < {error:.1e} W/m2), exact values computed on import', 3000)
+        else:
+            self.status_bar.showMessage('Preview (exact values)', 3000)
+
+    #---------------------------------------------------------------------------------------------
+    def serie_index(self, request):
+
+        solutionAstro, plotType, timeUnit, t_convention, t, parameters = request
+        if timeUnit == 'yr':
+            return t * t_convention * 1000
+        else:
+            return t * t_convention
+
+    #---------------------------------------------------------------------------------------------
+    def plot(self, request):
+
+        solutionAstro, plotType, timeUnit, t_convention, t, parameters = request
+        ylabel = series.quantities[plotType]
+
         ax = self.interactive_plot.axs[0]
         ax.clear()
         self.interactive_plot.reset()
@@ -559,48 +676,29 @@ class defineInsolationAstroSerieWindow(QWidget):
         points1 = ax.scatter(self.index, self.values, s=5, marker='o', color=color, visible=False)
         ax.line_points_pairs.append((line1, points1))
 
-        ax.set_xlabel(self.timeUnit)
+        ax.set_xlabel(timeUnit)
         ax.set_ylabel(ylabel)
         ax.autoscale()
 
         self.interactive_plot.fig.canvas.draw()
         self.interactive_plot.fig.canvas.setFocus()
-        self.status_bar.showMessage('Updated', 1000)
 
     #---------------------------------------------------------------------------------------------
     def import_serie(self):
 
-        if self.plotType in ["Eccentricity", "Obliquity", "Precession angle"]:
-            history = f'Astronomical serie "{self.plotType}"' 
-            shortName = f"{self.plotType} [degrees]"
-            
-        elif self.plotType == "Daily insolation":
-            history = f'Insolation serie "{self.plotType}" with parameters :' + \
-                        '<ul>' + \
-                        f'<li>Solar constant [W/m2]: {self.solar_constant_input.value()}' + \
-                        f'<li>Latitude [°]: {self.latitude_input.value()}' + \
-                        f'<li>True longitude [°]: {self.trueLongitude1_input.value()}' + \
-                        '</ul>'
-            shortName = "Daily insolation [W/m2]"
-
-        elif self.plotType == "Integrated insolation between 2 true longitudes":
-            history = f'Insolation serie "{self.plotType}" with parameters :' + \
-                        '<ul>' + \
-                        f'<li>Solar constant [W/m2]: {self.solar_constant_input.value()}' + \
-                        f'<li>Latitude [°]: {self.latitude_input.value()}' + \
-                        f'<li>True longitude #1 [°]: {self.trueLongitude1_input.value()}' + \
-                        f'<li>True longitude #2 [°]: {self.trueLongitude2_input.value()}' + \
-                        '</ul>'
-            shortName = "Integrated insolation [W/m2]"
-
-        elif self.plotType == "Caloric summer insolation" or \
-             self.plotType == "Caloric winter insolation":
-            history = f'Insolation serie "{self.plotType}" with parameters :' + \
-                        '<ul>' + \
-                        f'<li>Solar constant [W/m2]: {self.solar_constant_input.value()}' + \
-                        f'<li>Latitude [°]: {self.latitude_input.value()}' + \
-                        '</ul>'
-            shortName = f"{self.plotType} [W/m2]"
+        request = self.current_request()
+        if self.is_computed(request):
+            self.add_serie()
+        else:                                           # parameters changed since last plot
+            self.update_timer.stop()
+            self.start_computation(request, then_import=True)
+
+    #---------------------------------------------------------------------------------------------
+    def add_serie(self):
+
+        solutionAstro, plotType, timeUnit, t_convention, t, parameters = self.computed
+
+        shortName, history = series.serie_description(plotType, **parameters)
 
         serieDict = {
             'Id': generate_Id(), 
@@ -612,16 +710,59 @@ class defineInsolationAstroSerieWindow(QWidget):
             'Color': generate_color(),
             'History': '<BR>' + history,
             'Comment': '',
-            'Serie': pd.Series(self.values, index=self.index),
+            'Serie': pd.Series(self.computed_values, index=self.serie_index(self.computed)),
             }
 
         self.add_item_tree_widget(None, serieDict)          # will be added on parent from current index
 
     #---------------------------------------------------------------------------------------------
     def closeEvent(self, event):
+        self.update_timer.stop()
+        self.cancel_computation()
         self.open_insolationAstroSerieWindow.pop('123456', None)
         event.accept()
 
+#=========================================================================================
+class serieWorkerSignals(QObject):
+    progress = pyqtSignal(object, int)                  # worker, percent
+    finished = pyqtSignal(object, object, bool)         # worker, values, cache hit
+    error = pyqtSignal(object, str)                     # worker, message
+
+#=========================================================================================
+class serieWorker(QRunnable):
+    """Computes a serie out of the GUI thread; results are delivered through queued signals"""
+
+    def __init__(self, request, previous, workers, chunk_size):
+        super().__init__()
+        self.request = request
+        self.previous = previous
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.then_import = False
+        self.signals = serieWorkerSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        solutionAstro, plotType, timeUnit, t_convention, t, parameters = self.request
+        try:
+            values, hit = series.get_serie(solutionAstro, plotType, t,
+                                           workers=self.workers,
+                                           chunk_size=self.chunk_size,
+                                           previous=self.previous,
+                                           progress=lambda fraction: self.signals.progress.emit(self, int(100*fraction)),
+                                           cancelled=self._cancelled.is_set,
+                                           **parameters)
+        except series.Cancelled:
+            return
+        except Exception as e:
+            self.signals.error.emit(self, str(e))
+            return
+        if not self._cancelled.is_set():
+            self.signals.finished.emit(self, values, hit)
+
 #=========================================================================================
 # Example usage
 if __name__ == "__main__":
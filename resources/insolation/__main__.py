@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless insolation / astronomical series generator
+
+    python -m resources.insolation -s Laskar2004 -q daily --latitudes 65 -65 --longitudes 90 270 \
+                                   --start -1000 --end 0 --step 1 -o inso.xlsx
+
+    one serie is computed for each (latitude, true longitude) pair (one serie only for the orbital elements),
+    "Integrated insolation between 2 true longitudes" takes intervals of true longitudes written as lon1:lon2,
+    the calendar day and monthly mean insolations take --days and --months instead of the true longitudes,
+    for the insolation averaged over latitude bands, --latitudes are the band edges (or --band-step gives
+    bands from pole to pole) and all the bands are computed in one pass for each true longitude
+    the output format follows the file extension:
+        .csv   one column per serie, the first one being the time
+        .npz   arrays time, values (serie x time), latitude, latitude2, longitude1, longitude2, day, month, names
+        .xlsx  PyAnalySeries worksheet, to be opened from the application
+
+No PyQt5 import: this module is meant to run on machines without display.
+"""
+import sys
+import uuid
+import random
+import argparse
+import numpy as np
+import pandas as pd
+
+from . import astro
+from . import series
+from . import cache
+from . import cube
+
+#   short names accepted on the command line
+aliases = {
+    'eccentricity': "Eccentricity",
+    'obliquity': "Obliquity",
+    'precession-angle': "Precession angle",
+    'precession-parameter': "Precession parameter",
+    'daily': "Daily insolation",
+    'calendar-day': "Daily insolation on a calendar day",
+    'band': "Daily insolation averaged over a latitude band",
+    'monthly': "Monthly mean insolation",
+    'integrated': "Integrated insolation between 2 true longitudes",
+    'caloric-summer': "Caloric summer insolation",
+    'caloric-winter': "Caloric winter insolation",
+    'mean-annual': "Mean annual insolation",
+    'summer-energy': "Summer energy above threshold",
+    'gradient': "Latitudinal insolation gradient",
+}
+
+band_quantity = "Daily insolation averaged over a latitude band"
+
+#==========================================================================================
+def quantity_name(text):
+    if text in series.quantities:
+        return text
+    if text.lower() in aliases:
+        return aliases[text.lower()]
+    raise argparse.ArgumentTypeError(f"unknown quantity '{text}' (choose from {', '.join(aliases)})")
+
+def longitude_interval(text):
+    try:
+        values = [float(x) for x in text.split(':')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid true longitude '{text}'")
+    if len(values) > 2:
+        raise argparse.ArgumentTypeError(f"invalid true longitude '{text}'")
+    return tuple(values)
+
+#==========================================================================================
+#
+#   list of parameters dict, one per serie
+#
+def serie_parameters(quantity, latitudes, longitudes, solar_constant, days=(172,), months=(6,), **fixed):
+
+    used = series.quantity_parameters.get(quantity, ())
+    if not used:
+        return [{}]
+    if quantity == band_quantity:                                       # latitudes = band edges
+        if len(latitudes) < 2:
+            raise ValueError(f'"{quantity}" needs at least 2 band edges')
+        if any(len(lon) != 1 for lon in longitudes):
+            raise ValueError(f'"{quantity}" needs single true longitudes')
+        return [{'solar_constant': solar_constant, 'latitude': latitudes[i], 'latitude2': latitudes[i+1],
+                 'trueLongitude1': lon[0]}
+                for lon in longitudes for i in range(len(latitudes)-1)]
+    fixed = {k: v for k, v in fixed.items() if k in used}
+    if fixed:
+        return [dict(solar_constant=solar_constant, latitude=latitude, **fixed) for latitude in latitudes]
+    if "day" in used:
+        return [{'solar_constant': solar_constant, 'latitude': latitude, 'day': day}
+                for latitude in latitudes for day in days]
+    if "month" in used:
+        return [{'solar_constant': solar_constant, 'latitude': latitude, 'month': month}
+                for latitude in latitudes for month in months]
+
+    if "trueLongitude1" not in used:
+        longitudes = [(None,)]
+    elif "trueLongitude2" in used:
+        if any(len(lon) != 2 for lon in longitudes):
+            raise ValueError(f'"{quantity}" needs intervals of true longitudes written as lon1:lon2')
+    elif any(len(lon) != 1 for lon in longitudes):
+        raise ValueError(f'"{quantity}" needs single true longitudes')
+
+    parameters = []
+    for latitude in latitudes:
+        for lon in longitudes:
+            params = {'solar_constant': solar_constant, 'latitude': latitude}
+            if lon[0] is not None:
+                params['trueLongitude1'] = lon[0]
+            if len(lon) == 2:
+                params['trueLongitude2'] = lon[1]
+            parameters.append(params)
+    return parameters
+
+def column_name(quantity, params):
+    shortName, history = series.serie_description(quantity, **params)
+    name = shortName
+    if quantity == band_quantity:
+        return name + f" lon={params['trueLongitude1']:g}"
+    if 'latitude' in params:
+        name += f" lat={params['latitude']:g}"
+    if 'trueLongitude2' in params:
+        name += f" lon={params['trueLongitude1']:g}:{params['trueLongitude2']:g}"
+    elif 'trueLongitude1' in params:
+        name += f" lon={params['trueLongitude1']:g}"
+    if 'day' in params:
+        name += f" day={params['day']:g}"
+    return name
+
+#==========================================================================================
+def save_csv(fileName, index, xName, quantity, parameters, values):
+    df = pd.DataFrame({column_name(quantity, params): v for params, v in zip(parameters, values)}, index=index)
+    df.index.name = xName
+    df.to_csv(fileName)
+
+def save_npz(fileName, index, xName, quantity, parameters, values):
+    np.savez(fileName,
+             time=index,
+             values=np.array(values),
+             latitude=np.array([params.get('latitude', np.nan) for params in parameters]),
+             latitude2=np.array([params.get('latitude2', np.nan) for params in parameters]),
+             longitude1=np.array([params.get('trueLongitude1', np.nan) for params in parameters]),
+             longitude2=np.array([params.get('trueLongitude2', np.nan) for params in parameters]),
+             day=np.array([params.get('day', np.nan) for params in parameters]),
+             month=np.array([params.get('month', 0) for params in parameters]),
+             names=np.array([column_name(quantity, params) for params in parameters]))
+
+#
+#   PyAnalySeries worksheet, written by the same code as the ones of the application
+#
+def save_xlsx(fileName, index, xName, quantity, parameters, values):
+    from matplotlib import cm
+    from matplotlib.colors import to_hex
+    from ..workSheetLayout import write_xlsx_WorkSheet
+
+    colors = [to_hex(cm.tab20(i)) for i in range(20)]
+
+    itemDict_list = []
+    for params, v in zip(parameters, values):
+        shortName, history = series.serie_description(quantity, **params)
+        itemDict_list.append({
+            'Id': f"Id-{str(uuid.uuid4())[:8].upper()}",
+            'Type': 'Serie',
+            'Name': '',
+            'X': xName,
+            'Y': shortName,
+            'Y axis inverted': False,
+            'Color': random.choice(colors),
+            'History': '<BR>' + history,
+            'Comment': '',
+            'Serie': pd.Series(v, index=index),
+            })
+
+    write_xlsx_WorkSheet(fileName, itemDict_list, 'insolation generator')
+
+writers = {'.csv': save_csv, '.npz': save_npz, '.xlsx': save_xlsx}
+
+#==========================================================================================
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m resources.insolation',
+                                     description='Compute insolation / astronomical series without the graphical interface')
+    parser.add_argument('-s', '--solution', default='Laskar2004', choices=list(astro.solutions),
+                        help='astronomical solution (default: %(default)s)')
+    parser.add_argument('-q', '--quantity', default='daily', type=quantity_name,
+                        help=f'quantity, full name or one of: {", ".join(aliases)} (default: %(default)s)')
+    parser.add_argument('--latitudes', nargs='+', type=float, default=[65.], metavar='LAT',
+                        help='latitudes in degrees, band edges for the latitude bands (default: 65)')
+    parser.add_argument('--band-step', type=float, default=None, metavar='DEG',
+                        help='latitude bands of DEG degrees from pole to pole, instead of --latitudes')
+    parser.add_argument('--longitudes', nargs='+', type=longitude_interval, default=None, metavar='LON',
+                        help='true longitudes in degrees, lon1:lon2 for integrated insolation (default: 90, or 90:180)')
+    parser.add_argument('--days', nargs='+', type=float, default=[172.], metavar='DAY',
+                        help='calendar days, 1 = January 1st (default: 172 = June 21st)')
+    parser.add_argument('--months', nargs='+', type=int, default=list(range(1, 13)), choices=range(1, 13), metavar='MONTH',
+                        help='months, 1 = January, for monthly mean insolation (default: all)')
+    parser.add_argument('--threshold', type=float, default=275.,
+                        help='dayly insolation above which the summer energy is counted, W/m2 (default: %(default)s)')
+    parser.add_argument('--latitude2', type=float, default=25.,
+                        help='second latitude of the latitudinal gradient, degrees (default: %(default)s)')
+    parser.add_argument('--solar-constant', type=float, default=1365., help='solar constant in W/m2 (default: %(default)s)')
+    parser.add_argument('--start', type=float, default=-1000., help='first time (default: %(default)s)')
+    parser.add_argument('--end', type=float, default=0., help='last time, included (default: %(default)s)')
+    parser.add_argument('--step', type=float, default=1., help='time step (default: %(default)s)')
+    parser.add_argument('--unit', choices=['yr', 'kyr'], default='kyr', help='time unit (default: %(default)s)')
+    parser.add_argument('--past-positive', action='store_true', help='time convention past > 0 (default: past < 0)')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=series.default_chunk_size,
+                        help='time steps per task (default: %(default)s)')
+    parser.add_argument('--cache', action='store_true', help=f'use the persistent cache ({cache.cache.directory})')
+    parser.add_argument('-o', '--output', required=True, help='output file (.csv, .npz or .xlsx)')
+    args = parser.parse_args(argv)
+
+    extension = '.' + args.output.rsplit('.', 1)[-1].lower() if '.' in args.output else ''
+    if extension not in writers:
+        parser.error(f"unsupported output format '{extension}' (choose from {', '.join(writers)})")
+    if args.step <= 0:
+        parser.error('the time step must be positive')
+
+    quantity = args.quantity
+    if quantity not in series.available_quantities(args.solution):
+        parser.error(f"'{quantity}' is not available with {args.solution} "
+                     f"(choose from {', '.join(series.available_quantities(args.solution))})")
+    longitudes = args.longitudes
+    if longitudes is None:
+        longitudes = [(90., 180.)] if "trueLongitude2" in series.quantity_parameters.get(quantity, ()) else [(90.,)]
+    latitudes = args.latitudes
+    if args.band_step is not None:
+        try:
+            latitudes = list(cube.band_edges(args.band_step))
+        except ValueError as e:
+            parser.error(str(e))
+    try:
+        parameters = serie_parameters(quantity, latitudes, longitudes, args.solar_constant, args.days, args.months,
+                                      threshold=args.threshold, latitude2=args.latitude2)
+    except ValueError as e:
+        parser.error(str(e))
+
+    #   same time grid as the insolation window
+    t_convention = -1 if args.past_positive else 1
+    index = np.arange(args.start, args.end + args.step, args.step)
+    t = index * t_convention
+    if args.unit == 'yr': t = t/1000
+
+    solution = astro.get_solution(args.solution)
+    if not (solution.in_range(t.min()) and solution.in_range(t.max())):
+        parser.error(f'requested time scale is beyond the range of {args.solution}')
+
+    values = []
+    if quantity == band_quantity and not args.cache:                   # all the bands in one pass
+        for lon in longitudes:
+            values.extend(cube.band_insolation(solution, t, latitudes, lon[0], args.solar_constant))
+    else:
+        for params in parameters:
+            if args.cache:
+                v, hit = series.get_serie(args.solution, quantity, t, workers=args.workers, chunk_size=args.chunk_size, **params)
+            else:
+                v = series.compute_serie_parallel(args.solution, quantity, t, workers=args.workers, chunk_size=args.chunk_size, **params)
+            values.append(np.asarray(v, dtype=float))
+
+    xName = 'years' if args.unit == 'yr' else 'kyr'
+    writers[extension](args.output, index, xName, quantity, parameters, values)
+    print(f'{len(values)} serie(s) of {len(t)} steps written to {args.output}')
+
+if __name__ == '__main__':
+    sys.exit(main())
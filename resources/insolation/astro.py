@@ -8,20 +8,27 @@ Created on Mon Jul 18 11:38:33 2022
 import numpy as np
 from numpy import loadtxt
 import io
-from scipy.interpolate import interp1d
+from scipy.interpolate import CubicSpline
 from abc import ABC, abstractmethod
 import matplotlib.pyplot as plt
 import os
+import tempfile
+import threading
+from collections import OrderedDict
 
 from pathlib import Path
 MODULE_DIR = Path(__file__).parent
 
+#   spline coefficients not shipped with the tables (build step not run) are built on first use
+#   in this user cache directory, the package directory being possibly read-only
+spline_version = 1          # to be increased when the coefficients change
+spline_directory = Path(os.environ.get('PYANALYSERIES_SPLINE_DIR',
+                                       Path.home() / '.cache' / 'PyAnalySeries' / 'splines')) / f'v{spline_version}'
+
 #==========================================================================================
 class Astro(ABC):
-    def __init__(self):
-        self.path_Laskar2004 = MODULE_DIR / "astrofiles/Laskar2004/"
-        self.path_Laskar1993 = MODULE_DIR / "astrofiles/Laskar1993/"
-        self.path_Laskar2010 = MODULE_DIR / "astrofiles/Laskar2010/"
+    fileSpline = None             # spline coefficients of the tabulated solutions
+    provided = ('eccentricity', 'obliquity', 'precession_angle')      # orbital elements given by the solution
     @abstractmethod
     def in_range(self,time):
         pass
@@ -35,6 +42,142 @@ class Astro(ABC):
         pass
     def precession_parameter(self,time):
         return self.eccentricity(time)*np.sin(self.precession_angle(time))
+    #   all orbital elements at once, as a structured array of dtype elements_dtype
+    #   (the quantities not given by the solution are nan)
+    def elements(self,time):
+        ecc = self.eccentricity(time)
+        obl = self.obliquity(time)
+        pre = self.precession_angle(time)
+        par = None if pre is None else ecc*np.sin(pre)
+        return orbital_elements(ecc, obl, pre, par)
+    # memory held by the arrays of the solution (tables, interpolants, mapped coefficients), in bytes
+    def nbytes(self):
+        return _nbytes(self)
+    #   cubic interpolants of the quantities returned by self.table()
+    #       the coefficients are memory-mapped from self.fileSpline (shipped, see build_astro_files),
+    #       else from spline_directory, where they are built first if needed (build_spline)
+    def load_spline(self):
+        fileSpline = self.fileSpline
+        if not os.path.exists(fileSpline / "c.npy"):
+            fileSpline = spline_directory / fileSpline.name
+            if not os.path.exists(fileSpline / "c.npy"):
+                build_spline(fileSpline, *self.table())
+        x = np.load(fileSpline / "x.npy", mmap_mode='r')
+        c = np.load(fileSpline / "c.npy", mmap_mode='r')
+        return TableSpline(x, c)
+
+#------------------------------------------------------------------------------------------
+#   Orbital elements as a structured array (fields in radians, except the eccentricity)
+#
+elements_dtype = np.dtype([('eccentricity', float), ('obliquity', float),
+                           ('precession_angle', float), ('precession_parameter', float)])
+
+def orbital_elements(ecc, obl=None, pre=None, par=None):
+    elements = np.empty(np.shape(ecc), dtype=elements_dtype)
+    for name, values in zip(elements_dtype.names, (ecc, obl, pre, par)):
+        elements[name] = np.nan if values is None else values
+    return elements
+
+#------------------------------------------------------------------------------------------
+#   ASCII tables, possibly with Fortran double precision exponents (1.0D-02)
+#       the file is read by blocks of about chunk_bytes, cut at line ends; the exponents of each
+#       block are translated in place and parsed by np.loadtxt, so that the memory used is the size
+#       of one block plus the resulting array (instead of several copies of the whole text)
+#
+_fortran_exponent = bytes.maketrans(b'Dd', b'Ee')
+
+def loadtxt_fortran(fileName, chunk_bytes=2**24):
+    blocks = []
+    rest = b''
+    with open(fileName, 'rb') as f:
+        while True:
+            data = f.read(chunk_bytes)
+            if not data:
+                break
+            data = rest + data
+            end = data.rfind(b'\n') + 1
+            rest = data[end:]
+            if end > 0:
+                blocks.append(loadtxt(io.BytesIO(data[:end].translate(_fortran_exponent)), ndmin=2))
+    if rest.strip():
+        blocks.append(loadtxt(io.BytesIO(rest.translate(_fortran_exponent)), ndmin=2))
+    blocks = [b for b in blocks if b.size]
+    return np.concatenate(blocks) if blocks else np.empty((0, 0))
+
+#------------------------------------------------------------------------------------------
+#   Piecewise cubic coefficients of the tables
+#       same not-a-knot cubic spline as interp1d(x,y,kind='cubic'), fitted once and stored
+#       in the directory fileSpline, as uncompressed .npy files:
+#           x.npy   breakpoints (sorted)
+#           c.npy   coefficients (quantity, len(x)-1, 4), one contiguous row per interval
+#       each file is written under a temporary name then renamed, c.npy last, so that several
+#       processes building the same solution never memory-map a partly written file
+#
+def build_spline(fileSpline, x, columns):
+    order = np.argsort(x)             # tables are not sorted (past, then future, ...)
+    spline = CubicSpline(x[order], np.column_stack(columns)[order])
+    os.makedirs(fileSpline, exist_ok=True)
+    _save_atomic(fileSpline / "x.npy", spline.x)
+    _save_atomic(fileSpline / "c.npy", np.ascontiguousarray(np.transpose(spline.c, (2, 1, 0))))
+
+def _save_atomic(fileName, array):
+    fd, tmpFile = tempfile.mkstemp(dir=fileName.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array)
+        os.chmod(tmpFile, 0o644)              # mkstemp files are private
+        os.replace(tmpFile, fileName)
+    except BaseException:
+        if os.path.exists(tmpFile):
+            os.remove(tmpFile)
+        raise
+
+#------------------------------------------------------------------------------------------
+#   Piecewise cubics of all the quantities of a table, sharing the breakpoints x
+#       the interval of each time is located once (binary search in x) and the coefficients of
+#       the requested quantities are gathered for these intervals only, so that the cost does
+#       not depend on the length of the (memory-mapped) table
+#       raises ValueError for times outside of the table, as interp1d did
+#
+class TableSpline:
+    def __init__(self, x, c):
+        self.x = x                    # (n,)
+        self.c = c                    # (quantity, n-1, 4), highest power first
+    def locate(self, time):
+        n = len(self.x)
+        if np.any(time < self.x[0]):
+            raise ValueError(f"A value ({np.min(time)}) in time is below the range of the table ({self.x[0]}).")
+        if np.any(time > self.x[n-1]):
+            raise ValueError(f"A value ({np.max(time)}) in time is above the range of the table ({self.x[n-1]}).")
+        return np.clip(np.searchsorted(self.x, time, side='right')-1, 0, n-2)
+    #   values of the quantities rows (default: all), shape (len(rows),) + time.shape
+    def __call__(self, time, rows=None):
+        time = np.asarray(time, dtype=float)
+        rows = np.arange(len(self.c)) if rows is None else np.asarray(rows)
+        t = time.ravel()
+        i = self.locate(t)
+        c = self.c[rows[:,None], i[None,:]]
+        dx = t - self.x[i]
+        values = ((c[...,0]*dx + c[...,1])*dx + c[...,2])*dx + c[...,3]
+        return values.reshape((len(rows),) + time.shape)
+    #   function of time of a single quantity
+    def quantity(self, row):
+        return lambda time: self(time, [row])[0]
+
+def _nbytes(obj, depth=3, seen=None):
+    seen = set() if seen is None else seen
+    if isinstance(obj, np.ndarray):
+        while isinstance(obj.base, np.ndarray):     # views are counted once, with their base
+            obj = obj.base
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):                 # memory-mapped tables at their mapped size
+        return obj.nbytes
+    if depth == 0:
+        return 0
+    values = list(getattr(obj, '__dict__', {}).values())
+    return sum(_nbytes(value, depth-1, seen) for value in values)
 
 #==========================================================================================
 #
@@ -60,81 +203,108 @@ class AstroBerger1978(Astro):
         self.PreB = piSec*np.array([31.609970,32.620499,24.172195,0.636717,31.983780,3.138886,30.973251,44.828339,0.991874])
         self.PreC = piDeg*np.array([251.9025,280.8325,128.3057,348.1074,292.7251,165.1686,263.7952,15.3747,58.5749])
         
+    #   the terms are evaluated at once as a (time, terms) matrix, t being a scalar or an array
     def eccAndpi(self,t):
-        xes = 0         #-> e sin(π)
-        xec = 0         #-> e cos(π)
-        for i in range(19):
-            arg = self.EccB[i] * t + self.EccC[i]
-            xes += self.EccA[i] * np.sin( arg )
-            xec += self.EccA[i] * np.cos( arg )
+        arg = np.multiply.outer(t, self.EccB) + self.EccC
+        xes = np.sin(arg) @ self.EccA       #-> e sin(π)
+        xec = np.cos(arg) @ self.EccA       #-> e cos(π)
         return (xes,xec)
     def general_precession(self,t):
-        p = self.Pre2 * t
-        for i in range(9):
-            p += self.PreA[i] * np.sin( self.PreB[i] * t + self.PreC[i] )
+        p = self.Pre2 * t + np.sin(np.multiply.outer(t, self.PreB) + self.PreC) @ self.PreA
         return p + self.Pre1
+    def obliquity_(self,t):
+        return self.Obl1 + np.cos(np.multiply.outer(t, self.OblB) + self.OblC) @ self.OblA
         
-    def precession_angle(self,time):
-        t = 1000*time
+    #   eccentricity and precession angle, from the eccentricity and precession terms only
+    def eccAndpre(self,t):
         xes,xec = self.eccAndpi(t)
+        ecc = np.sqrt(xes*xes+xec*xec)
         perh = np.arctan2(xes,xec) + self.general_precession(t)
-        q,r = divmod(perh, 2*np.pi)
-        return r
+        q,pre = np.divmod(perh, 2*np.pi)
+        return ecc, pre
+
+    def precession_angle(self,time):
+        return self.eccAndpre(1000*time)[1]
     def eccentricity(self,time):
         xes,xec = self.eccAndpi(1000*time)
         return np.sqrt(xes*xes+xec*xec)
     def obliquity(self,time):
+        return self.obliquity_(1000*time)
+    def precession_parameter(self,time):
+        ecc, pre = self.eccAndpre(1000*time)
+        return ecc*np.sin(pre)
+    #   all orbital elements from a single evaluation of the series
+    def elements(self,time):
         t = 1000*time
-        x = self.Obl1
-        for i in range(18):
-            x += self.OblA[i] * np.cos( self.OblB[i] * t + self.OblC[i] )
-        return x
+        ecc, pre = self.eccAndpre(t)
+        return orbital_elements(ecc, self.obliquity_(t), pre, ecc*np.sin(pre))
     def in_range(self,time):
         return True
     
 #==========================================================================================
 #
-#   Laskar 2004
-#    
-class AstroLaskar2004(Astro):
+#   Solutions tabulated in ASCII files: time, eccentricity[, obliquity, precession angle]
+#       the files are concatenated once into a .npz table, interpolated by cubic splines (load_spline)
+#       on the columns eccentricity[, obliquity, sin and cos of the precession angle]
+#
+class AstroTabulated(Astro):
+    directory = None              # directory of the ASCII files and of the .npz table
+    tableName = None              # .npz table, {variant} being replaced by the variant
+    asciiFiles = ()               # (file name, first row kept), concatenated in this order
+    time_range = None             # (first, last) time of the table
+    variant = None
     def __init__(self):
-        super().__init__()
-
-        fileIn = self.path_Laskar2004 / "Laskar2004.npz"
+        self.spline = self.load_spline()
+
+    @classmethod
+    def table_files(cls):
+        return (MODULE_DIR / cls.directory / cls.tableName.format(variant=cls.variant),
+                [(MODULE_DIR / cls.directory / fileName.format(variant=cls.variant), first)
+                 for fileName, first in cls.asciiFiles])
+
+    #   time and columns to interpolate, without instance (build step)
+    @classmethod
+    def table(cls):
+        fileIn, asciiFiles = cls.table_files()
         if not os.path.exists(fileIn):
-                #Laskar 2004, past 51 ma (double precision)
-            path_Laskar2004_51 = self.path_Laskar2004 / "INSOLN.LA2004.BTL.ASC"
-                #Laskar 2004, next 21 ma (double precision)
-            path_Laskar2004_21 = self.path_Laskar2004 / "INSOLP.LA2004.BTL.ASC"
-                #Laskar 2004, past 101 ma (single precision)
-            path_Laskar2004_101 = self.path_Laskar2004 / "INSOLN.LA2004.BTL.100.ASC"
-            with open(path_Laskar2004_51,"r") as text_file:
-                a51 = loadtxt(io.StringIO(text_file.read().replace('D', 'E')))
-            with open(path_Laskar2004_21,"r") as text_file:
-                a21 = loadtxt(io.StringIO(text_file.read().replace('D', 'E')))
-            with open(path_Laskar2004_101,"r") as text_file:
-                a101 = loadtxt(text_file)
-                #Laskar 2004, compilation, de -101000 à +21000
-            a = np.concatenate([a51,a21[1:,:],a101[51001:,:]])
+            a = np.concatenate([loadtxt_fortran(fileName)[first:,:] for fileName, first in asciiFiles])
             np.savez(fileIn, a=a)
         else:
             data = np.load(fileIn)
             a = data['a']
-
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-        self.obl_function = interp1d(a[:,0],a[:,2],kind='cubic')
-        self.sin_pre_function = interp1d(a[:,0],np.sin(a[:,3]),kind='cubic')
-        self.cos_pre_function = interp1d(a[:,0],np.cos(a[:,3]),kind='cubic')
-        self.pre_function = (lambda x: np.arctan2(self.sin_pre_function(x),self.cos_pre_function(x)))
+        if 'obliquity' not in cls.provided:
+            return a[:,0], [a[:,1]]
+        return a[:,0], [a[:,1], a[:,2], np.sin(a[:,3]), np.cos(a[:,3])]
 
     def eccentricity(self,time):
-        return self.ecc_function(time)
+        return self.spline(time, [0])[0]
     def obliquity(self,time):
-        return self.obl_function(time)
+        if 'obliquity' in self.provided:
+            return self.spline(time, [1])[0]
     def precession_angle(self,time):
-        return self.pre_function(time)
+        if 'precession_angle' in self.provided:
+            return np.arctan2(*self.spline(time, [2, 3]))
+    def elements(self,time):
+        if 'obliquity' not in self.provided:
+            return orbital_elements(self.eccentricity(time))
+        ecc, obl, sin_pre, cos_pre = self.spline(time)
+        pre = np.arctan2(sin_pre, cos_pre)
+        return orbital_elements(ecc, obl, pre, ecc*np.sin(pre))
     def in_range(self,time):
-        return (time >= -101000.)and(time <= 21000.)
+        return (time >= self.time_range[0])and(time <= self.time_range[1])
+
+#==========================================================================================
+#
+#   Laskar 2004
+#    
+class AstroLaskar2004(AstroTabulated):
+    fileSpline = MODULE_DIR / "astrofiles/Laskar2004/Laskar2004_spline"
+    directory = "astrofiles/Laskar2004"
+    tableName = "Laskar2004.npz"
+    asciiFiles = [("INSOLN.LA2004.BTL.ASC", 0),              # past 51 ma (double precision)
+                  ("INSOLP.LA2004.BTL.ASC", 1),              # next 21 ma (double precision)
+                  ("INSOLN.LA2004.BTL.100.ASC", 51001)]      # past 101 ma (single precision), beyond 51 ma
+    time_range = (-101000., 21000.)
     
 #==========================================================================================
 #    
@@ -142,79 +312,21 @@ class AstroLaskar2004(Astro):
 #    
 
 #---------------------------------------------------
-class AstroLaskar1993_01(Astro):
-    def __init__(self):
-        super().__init__()
-
-        fileIn = self.path_Laskar1993 / "Laskar1993_01.npz"
-        if not os.path.exists(fileIn):
-                #Laskar 1993-01, past 20 ma (double precision)
-            path_Laskar1993_01_20 = self.path_Laskar1993 / "INSOLN.LA93_01.BTL.ASC"
-                #Laskar 1993-01, next 10 ma (double precision)
-            path_Laskar1993_01_10 = self.path_Laskar1993 / "INSOLP.LA93_01.BTL.ASC"
-            with open(path_Laskar1993_01_20,"r") as text_file:
-                a20 = loadtxt(io.StringIO(text_file.read().replace('D', 'E')))
-            with open(path_Laskar1993_01_10,"r") as text_file:
-                a10 = loadtxt(io.StringIO(text_file.read().replace('D', 'E')))
-                #Laskar 1993-01, compilation, de -20000 à +10000
-            a = np.concatenate([a20,a10[1:,:]])
-            np.savez(fileIn, a=a)
-        else:
-            data = np.load(fileIn)
-            a = data['a']
-
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-        self.obl_function = interp1d(a[:,0],a[:,2],kind='cubic')
-        #self.pre_function = interp1d(a[:,0],a[:,3],kind='cubic')
-        self.sin_pre_function = interp1d(a[:,0],np.sin(a[:,3]),kind='cubic')
-        self.cos_pre_function = interp1d(a[:,0],np.cos(a[:,3]),kind='cubic')
-        self.pre_function = (lambda x: np.arctan2(self.sin_pre_function(x),self.cos_pre_function(x)))
-    def eccentricity(self,time):
-        return self.ecc_function(time)
-    def obliquity(self,time):
-        return self.obl_function(time)
-    def precession_angle(self,time):
-        return self.pre_function(time)
-    def in_range(self,time):
-        return (time >= -20000.)and(time <= 10000.)
-
-#---------------------------------------------------
-class AstroLaskar1993_11(Astro):
-    def __init__(self):
-        super().__init__()
-
-        fileIn = self.path_Laskar1993 / "Laskar1993_11.npz"
-        if not os.path.exists(fileIn):
-                #Laskar 1993-11, past 20 ma (double precision)
-            path_Laskar1993_11_20 = self.path_Laskar1993 / "INSOLN.LA93_11.BTL.ASC"
-                #Laskar 1993-11, next 10 ma (double precision)
-            path_Laskar1993_11_10 = self.path_Laskar1993 / "INSOLP.LA93_11.BTL.ASC"
-            with open(path_Laskar1993_11_20,"r") as text_file:
-                a20 = loadtxt(io.StringIO(text_file.read().replace('D', 'E')))
-            with open(path_Laskar1993_11_10,"r") as text_file:
-                a10 = loadtxt(io.StringIO(text_file.read().replace('D', 'E')))
-                #Laskar 1993-01, compilation, de -20000 à +10000
-            a = np.concatenate([a20,a10[1:,:]])
-            np.savez(fileIn, a=a)
-        else:
-            data = np.load(fileIn)
-            a = data['a']
-
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-        self.obl_function = interp1d(a[:,0],a[:,2],kind='cubic')
-        #self.pre_function = interp1d(a[:,0],a[:,3],kind='cubic')
-        self.sin_pre_function = interp1d(a[:,0],np.sin(a[:,3]),kind='cubic')
-        self.cos_pre_function = interp1d(a[:,0],np.cos(a[:,3]),kind='cubic')
-        self.pre_function = (lambda x: np.arctan2(self.sin_pre_function(x),self.cos_pre_function(x)))
-    def eccentricity(self,time):
-        return self.ecc_function(time)
-    def obliquity(self,time):
-        return self.obl_function(time)
-    def precession_angle(self,time):
-        return self.pre_function(time)
-    def in_range(self,time):
-        return (time >= -20000.)and(time <= 10000.)
+class AstroLaskar1993(AstroTabulated):
+    variant = None                # '01' or '11'
+    directory = "astrofiles/Laskar1993"
+    tableName = "Laskar1993_{variant}.npz"
+    asciiFiles = [("INSOLN.LA93_{variant}.BTL.ASC", 0),      # past 20 ma (double precision)
+                  ("INSOLP.LA93_{variant}.BTL.ASC", 1)]      # next 10 ma (double precision)
+    time_range = (-20000., 10000.)
+
+class AstroLaskar1993_01(AstroLaskar1993):
+    variant = '01'
+    fileSpline = MODULE_DIR / "astrofiles/Laskar1993/Laskar1993_01_spline"
+
+class AstroLaskar1993_11(AstroLaskar1993):
+    variant = '11'
+    fileSpline = MODULE_DIR / "astrofiles/Laskar1993/Laskar1993_11_spline"
 
 #==========================================================================================
 #
@@ -222,92 +334,146 @@ class AstroLaskar1993_11(Astro):
 #    
 
 #---------------------------------------------------
-class AstroLaskar2010a(Astro):
-    def __init__(self):
-        super().__init__()
+class AstroLaskar2010(AstroTabulated):
+    variant = None                # 'a', 'b', 'c' or 'd'
+    provided = ('eccentricity',)
+    directory = "astrofiles/Laskar2010"
+    tableName = "Laskar2010{variant}.npz"
+    asciiFiles = [("La2010{variant}_ecc3L.dat", 0)]
+    time_range = (-249999., 0.)
 
-        fileIn = self.path_Laskar2010 / "Laskar2010a.npz"
-        if not os.path.exists(fileIn):
-                #Laskar 2010a, de -249999 à +0
-            path_Laskar2010a = self.path_Laskar2010 / "La2010a_ecc3L.dat"
-            with open(path_Laskar2010a,"r") as text_file:
-                a = loadtxt(text_file)
-            np.savez(fileIn, a=a)
-        else:
-            data = np.load(fileIn)
-            a = data['a']
-
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-    def eccentricity(self,time):
-        return self.ecc_function(time)
-    def in_range(self,time):
-        return (time >= -249999.)and(time <= 0.)
+class AstroLaskar2010a(AstroLaskar2010):
+    variant = 'a'
+    fileSpline = MODULE_DIR / "astrofiles/Laskar2010/Laskar2010a_spline"
 
-#---------------------------------------------------
-class AstroLaskar2010b(Astro):
-    def __init__(self):
-        super().__init__()
+class AstroLaskar2010b(AstroLaskar2010):
+    variant = 'b'
+    fileSpline = MODULE_DIR / "astrofiles/Laskar2010/Laskar2010b_spline"
 
-        fileIn = self.path_Laskar2010 / "Laskar2010b.npz"
-        if not os.path.exists(fileIn):
-                #Laskar 2010b, de -249999 à +0
-            path_Laskar2010b = self.path_Laskar2010 / "La2010b_ecc3L.dat"
-            with open(path_Laskar2010b,"r") as text_file:
-                a = loadtxt(text_file)
-            np.savez(fileIn, a=a)
-        else:
-            data = np.load(fileIn)
-            a = data['a']
+class AstroLaskar2010c(AstroLaskar2010):
+    variant = 'c'
+    fileSpline = MODULE_DIR / "astrofiles/Laskar2010/Laskar2010c_spline"
 
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-    def eccentricity(self,time):
-        return self.ecc_function(time)
-    def in_range(self,time):
-        return (time >= -249999.)and(time <= 0.)
+class AstroLaskar2010d(AstroLaskar2010):
+    variant = 'd'
+    fileSpline = MODULE_DIR / "astrofiles/Laskar2010/Laskar2010d_spline"
 
-#---------------------------------------------------
-class AstroLaskar2010c(Astro):
-    def __init__(self):
-        super().__init__()
 
-        fileIn = self.path_Laskar2010 / "Laskar2010c.npz"
-        if not os.path.exists(fileIn):
-                #Laskar 2010c, de -249999 à +0
-            path_Laskar2010c = self.path_Laskar2010 / "La2010c_ecc3L.dat"
-            with open(path_Laskar2010c,"r") as text_file:
-                a = loadtxt(text_file)
-            np.savez(fileIn, a=a)
-        else:
-            data = np.load(fileIn)
-            a = data['a']
-
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-    def eccentricity(self,time):
-        return self.ecc_function(time)
-    def in_range(self,time):
-        return (time >= -249999.)and(time <= 0.)
+#==========================================================================================
+#
+#   Name -> class table of the available solutions
+#    
+solutions = OrderedDict([
+    ("Berger1978", AstroBerger1978),
+    ("Laskar1993_01", AstroLaskar1993_01),
+    ("Laskar1993_11", AstroLaskar1993_11),
+    ("Laskar2004", AstroLaskar2004),
+    ("Laskar2010a", AstroLaskar2010a),
+    ("Laskar2010b", AstroLaskar2010b),
+    ("Laskar2010c", AstroLaskar2010c),
+    ("Laskar2010d", AstroLaskar2010d),
+])
 
-#---------------------------------------------------
-class AstroLaskar2010d(Astro):
-    def __init__(self):
-        super().__init__()
+#==========================================================================================
+#
+#   Process-wide registry of loaded solutions
+#       each solution is built once, on first request, then shared (GUI and scripts)
+#       max_bytes: optional memory limit, least recently used solutions are evicted beyond it
+#                  (the memory-mapped coefficients count for their whole size, as they may all be paged in)
+#    
+class AstroRegistry:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self._loaded = OrderedDict()        # name -> instance, least recently used first
+        self._lock = threading.Lock()
+        self._build_locks = {}              # name -> lock, so that a solution is built only once
+
+    def get(self, name):
+        if name not in solutions:
+            raise KeyError(f"Unknown astronomical solution '{name}'")
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return self._loaded[name]
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            with self._lock:
+                if name in self._loaded:            # built by another thread meanwhile
+                    self._loaded.move_to_end(name)
+                    return self._loaded[name]
+            solution = solutions[name]()
+            with self._lock:
+                self._loaded[name] = solution
+                self._evict()
+            return solution
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        while len(self._loaded) > 1 and self.nbytes() > self.max_bytes:
+            self._loaded.popitem(last=False)
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def nbytes(self):
+        return sum(solution.nbytes() for solution in self._loaded.values())
+
+    def loaded(self):
+        with self._lock:
+            return list(self._loaded)
+
+    def clear(self):
+        with self._lock:
+            self._loaded.clear()
+
+registry = AstroRegistry()
+
+def get_solution(name):
+    return registry.get(name)
+
+def solution_name(solution):
+    if isinstance(solution, str):
+        return solution
+    return next(name for name, cls in solutions.items() if type(solution) is cls)
 
-        fileIn = self.path_Laskar2010 / "Laskar2010d.npz"
-        if not os.path.exists(fileIn):
-                #Laskar 2010d, de -249999 à +0
-            path_Laskar2010d = self.path_Laskar2010 / "La2010d_ecc3L.dat"
-            with open(path_Laskar2010d,"r") as text_file:
-                a = loadtxt(text_file)
-            np.savez(fileIn, a=a)
-        else:
-            data = np.load(fileIn)
-            a = data['a']
+#==========================================================================================
+#
+#   Build step: (re)compute the spline coefficients shipped next to the tables (fileSpline),
+#   to be run where the package directory is writable (before installing or packaging)
+#    
+def build_spline_files(names=None):
+    for name in (names or solutions):
+        _build_files(name, force=True)
 
-        self.ecc_function = interp1d(a[:,0],a[:,1],kind='cubic')
-    def eccentricity(self,time):
-        return self.ecc_function(time)
-    def in_range(self,time):
-        return (time >= -249999.)and(time <= 0.)
+#
+#   Conversion step: the .npz tables (from the ASCII files) and the spline coefficients of
+#   every solution, one process per solution
+#       force: recompute the spline coefficients even if present (the .npz tables are kept,
+#              remove them to read the ASCII files again)
+#       returns the list of the names built
+#
+def build_astro_files(names=None, workers=None, force=False):
+    names = [name for name in (names or solutions) if solutions[name].fileSpline is not None]
+    workers = min(workers or os.cpu_count() or 1, max(len(names), 1))
+    if workers <= 1:
+        for name in names:
+            _build_files(name, force)
+        return names
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_build_files, names, [force]*len(names)))
+    return names
+
+def _build_files(name, force=False):
+    cls = solutions[name]
+    if cls.fileSpline is None:              # analytical solution, nothing to store
+        return
+    if not force and os.path.exists(cls.fileSpline / "c.npy"):
+        return
+    build_spline(cls.fileSpline, *cls.table())
 
 
 #######################     END     #######################
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Accuracy and speed benchmark of the insolation module
+
+    python -m resources.insolation.bench [--sizes 1000 10000 100000] [--solutions Laskar2004 ...]
+
+    For every astronomical solution and every grid size n, the time axis is np.linspace(-5000, 0, n) kyr.
+    Each public function is timed (best of --repeat runs) and its values at t = -5000, -4500, ..., 0 kyr
+    (points shared by all the grids) are compared with the stored reference values (bench_reference.json).
+    The process exits with status 1 when a value differs from its reference by more than --rtol.
+
+    python -m resources.insolation.bench --update-reference
+        stores the current values as the new reference, to be done only when a change of the results is
+        intended (and then with the new cache.version)
+
+    The Laskar2010 solutions only give the eccentricity: the insolation functions are not run on them.
+"""
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from pathlib import Path
+
+from . import inso
+from . import astro
+
+deg_to_rad = np.pi/180.
+
+reference_file = Path(__file__).parent / "bench_reference.json"
+default_sizes = [1000, 10000, 100000]
+t_start, t_end = -5000., 0.
+n_check = 11                                        # check points, shared by all the grids
+
+#   parameters of the benchmarked calls
+phi = 65*deg_to_rad
+lon = 90*deg_to_rad
+
+#
+#   name -> function of (ecc, obl, pre), timed once the orbital elements are computed
+#
+functions = {
+    'inso_dayly_radians': lambda ecc, obl, pre: inso.inso_dayly_radians(lon, phi, obl, ecc, pre),
+    'inso_mean_radians': lambda ecc, obl, pre: inso.inso_mean_radians(0, lon, phi, obl, ecc, pre),
+    'inso_caloric_summer_NH': lambda ecc, obl, pre: inso.inso_caloric_summer_NH(phi, obl, ecc, pre),
+    'inso_caloric_winter_NH': lambda ecc, obl, pre: inso.inso_caloric_winter_NH(phi, obl, ecc, pre),
+    'inso_mean_lat_radians': lambda ecc, obl, pre: inso.inso_mean_lat_radians(lon, 60*deg_to_rad, 70*deg_to_rad, obl, ecc, pre),
+    'trueLongitude': lambda ecc, obl, pre: inso.trueLongitude(np.pi/4, ecc, pre),
+}
+
+#==========================================================================================
+def best_time(f, repeat):
+    result = f()
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def time_grid(n):
+    return np.linspace(t_start, t_end, n)
+
+def check_points(n):
+    return np.arange(n_check)*((n-1)//(n_check-1))
+
+#
+#   {name: (seconds, values at the check points)} for one solution and one grid size
+#       n-1 must be a multiple of n_check-1, so that the grid contains the check points
+#
+def run(solution, n, repeat=3):
+    astro_params = astro.get_solution(solution)
+    t = time_grid(n)
+    check = check_points(n)
+    results = {}
+
+    seconds, ecc = best_time(lambda: astro_params.eccentricity(t), repeat)
+    results['eccentricity'] = (seconds, ecc[check])
+    if astro_params.obliquity(t[:1]) is None:                           # eccentricity only
+        return results
+    seconds, obl = best_time(lambda: astro_params.obliquity(t), repeat)
+    results['obliquity'] = (seconds, obl[check])
+    seconds, pre = best_time(lambda: astro_params.precession_angle(t), repeat)
+    results['precession_angle'] = (seconds, pre[check])
+    seconds, elements = best_time(lambda: astro_params.elements(t), repeat)       # all of them in one pass
+    results['elements'] = (seconds, elements['precession_parameter'][check])
+
+    for name, f in functions.items():
+        seconds, values = best_time(lambda: f(ecc, obl, pre), repeat)
+        results[name] = (seconds, values[check])
+    return results
+
+def compare(values, reference, rtol):
+    values = np.asarray(values, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    if values.shape != reference.shape:
+        return np.inf
+    scale = np.maximum(np.abs(reference), 1e-300)
+    return np.max(np.abs(values - reference)/scale)
+
+#==========================================================================================
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m resources.insolation.bench',
+                                     description='Time the insolation functions and check them against reference values')
+    parser.add_argument('--sizes', nargs='+', type=int, default=default_sizes,
+                        help='numbers of time steps, rounded to 10k+1 (default: %(default)s)')
+    parser.add_argument('--solutions', nargs='+', default=list(astro.solutions), choices=list(astro.solutions),
+                        help='astronomical solutions (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per function, the best is kept (default: %(default)s)')
+    parser.add_argument('--rtol', type=float, default=1e-9, help='relative tolerance of the check (default: %(default)s)')
+    parser.add_argument('--update-reference', action='store_true', help=f'store the current values in {reference_file.name}')
+    args = parser.parse_args(argv)
+
+    sizes = [(max(n, n_check)//(n_check-1))*(n_check-1) + 1 for n in args.sizes]
+
+    reference = {}
+    if reference_file.exists():
+        with open(reference_file) as f:
+            reference = json.load(f)
+
+    failed = []
+    new_reference = {}
+    print(f"{'solution':<15}{'function':<25}" + ''.join(f"{n:>12}" for n in sizes) + "   check")
+    for solution in args.solutions:
+        timings = {}
+        checks = {}
+        for n in sizes:
+            for name, (seconds, values) in run(solution, n, args.repeat).items():
+                timings.setdefault(name, []).append(seconds)
+                if name not in checks:
+                    checks[name] = values
+                elif compare(values, checks[name], args.rtol) > args.rtol:          # grids disagree
+                    checks[name] = None
+
+        new_reference[solution] = {}
+        for name, seconds in timings.items():
+            values = checks[name]
+            expected = reference.get(solution, {}).get(name)
+            if values is None:
+                status = 'FAILED (grid sizes disagree)'
+            elif expected is None:
+                status = 'no reference'
+            else:
+                error = compare(values, expected, args.rtol)
+                status = 'ok' if error <= args.rtol else f'FAILED (relative error {error:.1e})'
+            if status.startswith('FAILED'):
+                failed.append((solution, name))
+            if values is not None:
+                new_reference[solution][name] = [float(v) for v in values]
+            print(f"{solution:<15}{name:<25}" + ''.join(f"{1000*s:>10.2f}ms" for s in seconds) + f"   {status}")
+
+    if args.update_reference:
+        reference.update(new_reference)
+        with open(reference_file, 'w') as f:
+            json.dump(reference, f, indent=1)
+        print(f'reference values written to {reference_file}')
+        return 0
+
+    if failed:
+        print(f'{len(failed)} check(s) failed')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
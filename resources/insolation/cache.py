@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of computed series
+
+    content-addressed: the file name is the sha256 of the parameters of the serie
+    (solution, quantity, parameters used by the quantity, time grid), so that a same
+    curve is computed only once across sessions
+    bounded: beyond max_bytes, the least recently used files are removed
+             (the modification time of a file is updated each time it is read)
+"""
+import os
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+
+version = 1                 # to be increased when computed values change
+
+default_directory = Path(os.environ.get('PYANALYSERIES_CACHE_DIR',
+                                        Path.home() / '.cache' / 'PyAnalySeries' / 'insolation'))
+default_max_bytes = 200 * 2**20
+
+#==========================================================================================
+class SerieCache:
+    def __init__(self, directory=default_directory, max_bytes=default_max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, solution, quantity, t, **params):
+        # numbers as float, so that 65 (GUI) and 65.0 (command line) give the same key
+        params = {name: float(value) if isinstance(value, (int, float, np.number)) and not isinstance(value, bool) else value
+                  for name, value in params.items()}
+        h = hashlib.sha256()
+        h.update(repr((version, solution, quantity, sorted(params.items()))).encode())
+        h.update(np.ascontiguousarray(t, dtype=float).tobytes())
+        return h.hexdigest()
+
+    def path(self, key):
+        return self.directory / f"{key}.npy"
+
+    def get(self, key):
+        fileName = self.path(key)
+        try:
+            values = np.load(fileName)
+            os.utime(fileName)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return values
+
+    def put(self, key, values):
+        values = np.asarray(values, dtype=float)
+        if values.nbytes > self.max_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fileTmp = self.directory / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(fileTmp, 'wb') as f:
+                    np.save(f, values)
+                os.replace(fileTmp, self.path(key))
+            except BaseException:
+                if os.path.exists(fileTmp):
+                    os.remove(fileTmp)
+                raise
+            self.evict()
+        except OSError:
+            pass                            # a cache that cannot be written is just not used
+
+    def evict(self):
+        with self._lock:
+            files = []
+            for fileName in self.directory.glob('*.npy'):
+                try:
+                    st = fileName.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, fileName))
+            total = sum(size for mtime, size, fileName in files)
+            for mtime, size, fileName in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    fileName.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            for fileName in self.directory.glob('*.npy'):
+                try:
+                    fileName.unlink()
+                except OSError:
+                    pass
+
+cache = SerieCache()
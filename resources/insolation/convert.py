@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+One-shot conversion of the astronomical tables
+
+    python -m resources.insolation.convert [--force] [--workers N] [solution ...]
+
+    builds, for every tabulated solution (default: all), the .npz table from the ASCII files
+    when it is missing, then the spline coefficients (astro.build_astro_files), one process
+    per solution
+"""
+import sys
+import time
+import argparse
+
+from . import astro
+
+def main(argv=None):
+
+    tabulated = [name for name, cls in astro.solutions.items() if cls.fileSpline is not None]
+
+    parser = argparse.ArgumentParser(prog='python -m resources.insolation.convert',
+                                     description='Build the tables and spline coefficients of the astronomical solutions')
+    parser.add_argument('solutions', nargs='*', metavar='solution',
+                        help=f'solutions to build (default: all, among {", ".join(tabulated)})')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: number of CPUs)')
+    parser.add_argument('--force', action='store_true', help='recompute the spline coefficients even if present')
+    args = parser.parse_args(argv)
+    for name in args.solutions:
+        if name not in tabulated:
+            parser.error(f"unknown solution '{name}' (choose from {', '.join(tabulated)})")
+
+    t0 = time.perf_counter()
+    names = astro.build_astro_files(args.solutions or None, workers=args.workers, force=args.force)
+    print(f'{", ".join(names)} built in {time.perf_counter() - t0:.1f}s')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batched insolation: (time x latitude x season) cubes computed in one vectorized call
+
+    the orbital elements (eps, e, per) are time series, the latitudes and the seasons
+    (true longitudes, calendar days or months) are 1-D arrays: they are broadcast together
+    as (time, latitude, season) and passed once to the functions of inso.py
+    latitude bands: (band x time) arrays of the dayly insolation averaged between successive edges
+"""
+import numpy as np
+import pandas as pd
+
+from . import inso
+from . import astro
+
+deg_to_rad = np.pi/180.
+
+#
+#   dimensionless dayly insolation - should be multiplied by solar constant
+#   inputs
+#       lon: true longitudes (radians), shape (nlon,)
+#       phi: latitudes (radians), shape (nlat,)
+#       eps, e, per: obliquity, eccentricity, precession (radians), shape (ntime,)
+#   output: shape (ntime, nlat, nlon)
+#
+def inso_dayly_cube(lon,phi,eps,e,per):
+    eps,e,per = (np.asarray(x)[:,None,None] for x in (eps,e,per))
+    return inso.inso_dayly_radians(np.asarray(lon)[None,None,:],np.asarray(phi)[None,:,None],eps,e,per)
+#
+#   idem with
+#       day: calendar days (1 = January 1st), shape (nday,)
+#   output: shape (ntime, nlat, nday)
+#
+def inso_dayly_day_cube(day,phi,eps,e,per):
+    eps,e,per = (np.asarray(x)[:,None,None] for x in (eps,e,per))
+    lon = inso.calendar_day_to_trueLongitude(np.asarray(day)[None,None,:],e,per)
+    return inso.inso_dayly_radians(lon,np.asarray(phi)[None,:,None],eps,e,per)
+
+#
+#   insolation cube in W/m2 for an astronomical solution (name or Astro instance)
+#       t: time (kyr, past < 0), latitudes and longitudes in degrees, or days instead of longitudes
+#
+def insolation_cube(solution,t,latitudes,longitudes=None,days=None,solar_constant=1365):
+    if (longitudes is None) == (days is None):
+        raise ValueError("Give either longitudes or days")
+    astro_params = astro.get_solution(solution) if isinstance(solution, str) else solution
+    t = np.asarray(t, dtype=float)
+    elements = astro_params.elements(t)
+    ecc, obl, pre = elements['eccentricity'], elements['obliquity'], elements['precession_angle']
+    phi = np.asarray(latitudes, dtype=float)*deg_to_rad
+    if days is None:
+        return solar_constant*inso_dayly_cube(np.asarray(longitudes, dtype=float)*deg_to_rad,phi,obl,ecc,pre)
+    else:
+        return solar_constant*inso_dayly_day_cube(np.asarray(days, dtype=float),phi,obl,ecc,pre)
+
+#
+#   monthly mean insolation in W/m2, all the months at every time step in one call
+#       t: time (kyr, past < 0), latitudes in degrees
+#   output: shape (ntime, nlat, 12)
+#
+def monthly_insolation_cube(solution,t,latitudes,solar_constant=1365):
+    astro_params = astro.get_solution(solution) if isinstance(solution, str) else solution
+    t = np.asarray(t, dtype=float)
+    elements = astro_params.elements(t)
+    eps,e,per = (elements[name][:,None,None] for name in ('obliquity','eccentricity','precession_angle'))
+    phi = np.asarray(latitudes, dtype=float)[None,:,None]*deg_to_rad
+    return solar_constant*inso.inso_monthly_mean_radians(np.arange(1,13)[None,None,:],phi,eps,e,per)
+
+#
+#   edges of the latitude bands of width step (degrees) from pole to pole
+#
+def band_edges(step=5):
+    n = int(round(180/step))
+    if n < 1 or not np.isclose(n*step, 180):
+        raise ValueError("The band width must divide 180°")
+    return np.linspace(-90, 90, n+1)
+
+#
+#   dayly insolation in W/m2 averaged over latitude bands (area weighted), all the bands in one call
+#       t: time (kyr, past < 0), edges: latitudes of the band edges in degrees (default: 5° bands),
+#       longitude: true longitude in degrees
+#   output: shape (nband, ntime)
+#
+def band_insolation(solution,t,edges=None,longitude=90,solar_constant=1365):
+    astro_params = astro.get_solution(solution) if isinstance(solution, str) else solution
+    t = np.asarray(t, dtype=float)
+    edges = band_edges() if edges is None else np.asarray(edges, dtype=float)
+    elements = astro_params.elements(t)
+    ecc, obl, pre = elements['eccentricity'], elements['obliquity'], elements['precession_angle']
+    return solar_constant*inso.inso_mean_lat_bands_radians(longitude*deg_to_rad,edges*deg_to_rad,obl,ecc,pre)
+
+#
+#   export as a set of series, one per band (latitude1, latitude2), indexed by time
+#
+def bands_to_series(values,t,edges):
+    return {(edges[i], edges[i+1]): pd.Series(values[i], index=t) for i in range(len(edges)-1)}
+
+#
+#   export as a set of series, one per (latitude, season), indexed by time
+#
+def cube_to_series(cube,t,latitudes,seasons):
+    series = {}
+    for i, latitude in enumerate(latitudes):
+        for j, season in enumerate(seasons):
+            series[(latitude, season)] = pd.Series(cube[:,i,j], index=t)
+    return series
+
+#
+#   export as a single grid (npz with the cube and its coordinates)
+#       seasonName: 'longitude' or 'day'
+#
+def save_cube(fileName,cube,t,latitudes,seasons,seasonName='longitude'):
+    np.savez(fileName, insolation=cube, time=np.asarray(t), latitude=np.asarray(latitudes),
+             **{seasonName: np.asarray(seasons)})
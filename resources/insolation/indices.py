@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Insolation indices integrated over the year
+
+    The year is sampled on a grid of true longitudes shared by all the time steps (and latitudes):
+    the dimensionless dayly insolation g is evaluated once on the (time, latitude, longitude) grid
+    and the integrals over the year are quadratures along the longitude axis.
+    With dt/dlon = (r/a)^2 T / (2π sqrt(1-e^2)), the energy received during an interval of true
+    longitudes is
+        S0 T / (2π sqrt(1-e^2)) * integral(g dlon)
+    so that eccentricity and precession only enter through this factor and the threshold test.
+
+    mean_annual_insolation: mean over the year, W/m2
+    summer_energy: energy received while the dayly insolation is above a threshold (Huybers 2006), GJ/m2
+    latitudinal_gradient: difference of mean annual insolation between 2 latitudes, W/m2
+
+    The time axis is processed by chunks, so that the memory used does not depend on its length.
+"""
+import numpy as np
+
+from . import inso
+
+deg_to_rad = np.pi/180.
+
+default_nlon = 1440                             # 0.25° of true longitude, about 6 hours
+default_chunk_size = 2000                       # time steps per chunk
+seconds_per_year = inso.year_length*86400
+
+#
+#   true longitudes of the quadrature (uniform, periodic: all the weights are equal)
+#
+def longitude_grid(nlon=default_nlon):
+    return (np.arange(nlon) + 0.5)*2*np.pi/nlon
+
+#
+#   dimensionless dayly insolation g on the grid, shape (ntime, nlat, nlon) and ratio (a/r)^2, shape (ntime, 1, nlon)
+#
+def dayly_grid(lon,phi,eps,e,per):
+    eps,e,per = (np.asarray(x, dtype=float)[:,None,None] for x in (eps,e,per))
+    lon = lon[None,None,:]
+    g = inso.inso_g(np.sin(eps)*np.sin(lon), np.sin(np.asarray(phi, dtype=float))[None,:,None])
+    ar = (1-e*np.cos(lon-per))/(1-e*e)
+    return g, ar*ar
+
+def _chunks(n, chunk_size):
+    return [slice(start, min(start+chunk_size, n)) for start in range(0, n, chunk_size)]
+
+#==========================================================================================
+#
+#   mean annual insolation in W/m2
+#       phi: latitudes (radians), shape (nlat,); eps, e, per: time series, shape (ntime,)
+#   output: shape (ntime, nlat)
+#
+def mean_annual_insolation(phi,eps,e,per,solar_constant=1365,nlon=default_nlon,chunk_size=default_chunk_size):
+    eps,e,per = (np.atleast_1d(np.asarray(x, dtype=float)) for x in (eps,e,per))
+    phi = np.atleast_1d(phi)
+    lon = longitude_grid(nlon)
+    result = np.empty((len(eps), len(phi)))
+    for s in _chunks(len(eps), chunk_size):
+        g, ar2 = dayly_grid(lon,phi,eps[s],e[s],per[s])
+        result[s] = g.mean(axis=2)/np.sqrt(1-e[s,None]*e[s,None])
+    return solar_constant*result
+
+#
+#   energy received while the dayly insolation is above threshold (W/m2), in GJ/m2
+#       the fraction of each longitude interval above the threshold is interpolated linearly
+#       between the grid points, so that the result is continuous in threshold and time
+#   output: shape (ntime, nlat)
+#
+def summer_energy(phi,eps,e,per,threshold=275,solar_constant=1365,nlon=default_nlon,chunk_size=default_chunk_size):
+    eps,e,per = (np.atleast_1d(np.asarray(x, dtype=float)) for x in (eps,e,per))
+    phi = np.atleast_1d(phi)
+    lon = longitude_grid(nlon)
+    dlon = 2*np.pi/nlon
+    result = np.empty((len(eps), len(phi)))
+    for s in _chunks(len(eps), chunk_size):
+        g, ar2 = dayly_grid(lon,phi,eps[s],e[s],per[s])
+        w = solar_constant*ar2*g - threshold                # W/m2 above the threshold
+        g1, w1 = np.roll(g, -1, axis=2), np.roll(w, -1, axis=2)
+        #   interval [lon_k, lon_k+1]: integral of g on the part above the threshold
+        above0, above1 = w >= 0, w1 >= 0
+        cross = above0 != above1
+        x = np.where(cross, w/np.where(cross, w-w1, 1), 0)    # position of the crossing in the interval
+        g_cross = g + (g1-g)*x
+        part = np.where(above0 & above1, (g+g1)/2,
+                        np.where(cross, np.where(above0, x*(g+g_cross)/2, (1-x)*(g_cross+g1)/2), 0))
+        integral = part.sum(axis=2)*dlon
+        result[s] = integral/(2*np.pi*np.sqrt(1-e[s,None]*e[s,None]))
+    return solar_constant*seconds_per_year*result/1e9
+
+#
+#   mean annual insolation at phi1 minus at phi2, in W/m2 (both latitudes on the same grid)
+#   output: shape (ntime,)
+#
+def latitudinal_gradient(phi1,phi2,eps,e,per,solar_constant=1365,nlon=default_nlon,chunk_size=default_chunk_size):
+    mean = mean_annual_insolation(np.array([phi1, phi2]),eps,e,per,solar_constant,nlon,chunk_size)
+    return mean[:,0] - mean[:,1]
@@ -10,7 +10,6 @@ Last modified   Wed Jan 22 13:18:00 2025
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy import optimize
 from scipy.special import elliprd, elliprf, elliprj, ellipeinc, ellipkinc, ellipe
 
 #
@@ -21,8 +20,20 @@ from scipy.special import elliprd, elliprf, elliprj, ellipeinc, ellipkinc, ellip
 #Mathematica
 #  solveKepler[e_, v_] := x /. FindRoot[v == x - e Sin[x], {x, v}];
 #
-def solveKepler(e,v):
-    return optimize.newton(lambda x: x-v - e*np.sin(x), v, fprime2=lambda x: 1 - e*np.cos(x))
+#  e and v can be numpy arrays (broadcast together): a fixed number of Halley iterations
+#     is applied to all values at once, starting from the 2nd order expansion
+#     x0 = v + e sinv (1 + e cosv), whose error is O(e^3).
+#     For the Earth (e <= 0.07) the result is at machine precision after 2 iterations,
+#     the default niter=3 leaves some margin; increase it for very eccentric orbits.
+#
+def solveKepler(e,v,niter=3):
+    x = v + e*np.sin(v)*(1 + e*np.cos(v))
+    for i in range(niter):
+        esinx = e*np.sin(x)
+        f = x - esinx - v               # f(x)
+        f1 = 1 - e*np.cos(x)            # f'(x)
+        x = x - 2*f*f1/(2*f1*f1 - f*esinx)
+    return x
 
 #
 #  computes the true anomaly (angular position from perihelion, in radian)
@@ -39,6 +50,7 @@ def trueAnomalie(e,meanA):
 #
 #  computes the mean anomaly  (time from perihelion = 2πt/T, in radian)
 #     from the true anomaly (angular position from perihelion, in radian)
+#     (closed form, no solver needed: e and trueA can be numpy arrays)
 #
 def meanAnomalie(e,trueA):
     (n,v) = np.divmod(trueA+np.pi, 2*np.pi)
@@ -56,6 +68,28 @@ def meanAnomalie(e,trueA):
 def trueLongitude(meanL,e,perL,refL=0):
     return trueAnomalie(e,meanL+meanAnomalie(e,refL-perL+np.pi))+perL-np.pi
 
+#
+#  computes the true longitude of calendar days (day 1 = January 1st, can be fractional)
+#      with a year of 365.2425 days and the spring equinox fixed on March 21st (day 80)
+#      day, e and perL can be numpy arrays: one conversion for every day and time step at once
+#
+year_length = 365.2425
+day_equinox = 80
+
+def calendar_day_to_trueLongitude(day,e,perL):
+    meanL = 2*np.pi*(day-day_equinox)/year_length
+    return np.mod(trueLongitude(meanL,e,perL), 2*np.pi)
+
+#
+#  first day of the calendar months (day 1 = January 1st), the 365 days calendar being
+#      stretched to year_length; month_start[12] is the end of December
+#
+month_days = [31,28,31,30,31,30,31,31,30,31,30,31]
+month_start = 1 + np.concatenate([[0],np.cumsum(month_days)])*year_length/365
+
+def calendar_day_to_meanLongitude(day):
+    return 2*np.pi*(day-day_equinox)/year_length
+
 
 ###################
 #
@@ -63,7 +97,7 @@ def trueLongitude(meanL,e,perL,refL=0):
 #
 def length_of_season(lon1,lon2,e,per):
     d_ano = meanAnomalie(e,lon2-per+np.pi)- meanAnomalie(e,lon1-per+np.pi)
-    return d_ano*365.2425/2/np.pi
+    return d_ano*year_length/2/np.pi
 
 
 
@@ -80,39 +114,35 @@ def length_of_season(lon1,lon2,e,per):
 #      n = (phi+π/2) div π
 #      ellipE(phi,m) = 2 n ellipE(m) + ellipE(phi - nπ, m)
 #  This corresponds to the Mathematica function Re[EllipticE[phi,m]]
+#  Note:
+#    phi and m can be numpy arrays (broadcast together): the special cases (xphi == 0, n == 0)
+#    are masked with np.where, the Carlson integrals being ufuncs only evaluated out of z == 0 && m == 1
 #
 def ellipE(phi,m):
     (n,xphi) = np.divmod(phi+np.pi/2, np.pi)
     xphi -= np.pi/2           #  phi == xphi + n*pi   &&   -pi/2 <= xphi < pi/2
-    s = 1 - 2*(n%2)           #  s = (-1)^n
     sg = np.sign(xphi)
     
     def ellipE_(z,m):
-        if z==0 and m==1:
-            return 1
-        else:
-            return elliprf(z+m-1,z,z+m)-m*elliprd(z+m-1,z,z+m)/3
+        z, m = np.broadcast_arrays(z, m)
+        ok = (z!=0) | (m!=1)      # Carlson integrals evaluated only there (no 'invalid value' warning)
+        e = np.ones(z.shape)
+        z, m = z[ok], m[ok]
+        e[ok] = elliprf(z+m-1,z,z+m)-m*elliprd(z+m-1,z,z+m)/3
+        return e
     
-    if xphi==0:   # probably a test like 'abs(xphi)<verysmall' would be safer...
-        e = 0
-    else:
-        c = np.square(1/np.sin(xphi))
-        z = max(0,c-m)
-        #e = sg*(elliprf(z+m-1,z,z+m)-m*elliprd(z+m-1,z,z+m)/3)
-        e = sg * ellipE_(z,m)
+    nz = xphi!=0              # probably a test like 'abs(xphi)<verysmall' would be safer...
+    c = np.square(1/np.sin(np.where(nz,xphi,np.pi/2)))
+    z = np.maximum(0,c-m)
+    e = np.where(nz, sg*ellipE_(z,m), 0)
     
     #e = sg*(elliprf(c-1,c-m,c)-m*elliprd(c-1,c-m,c)/3)
     #e = (sg/np.sqrt(c))*(elliprf(1-1/c,1-m/c,1)-(m/c)*elliprd(1-1/c,1-m/c,1)/3)
     #sinphi = np.sin(xphi)
     #sinphi2 = np.square(sinphi)
     #e = sg*sinphi*(elliprf(1-sinphi2,1-m*sinphi2,1)-m*sinphi2*elliprd(1-sinphi2,1-m*sinphi2,1)/3)
-    #print('e = ',sg*sinphi*(elliprf(1-sinphi2,1-m*sinphi2,1)-m*sinphi2*elliprd(1-sinphi2,1-m*sinphi2,1)/3))
-    if n==0:
-        k = 0
-    else:
-        z = max(0,1-m)
-        #k = (elliprf(z+m-1,z,z+m)-m*elliprd(z+m-1,z,z+m)/3)
-        k = ellipE_(z,m)
+    z = np.maximum(0,1-m)
+    k = np.where(n!=0, ellipE_(z,m), 0)
     return 2*n*k + e
 '''
 #Mathematica
@@ -163,29 +193,23 @@ def ellipPi(s2,phi,m):
 def ellipP(s2,phi,m):     # = ellipF(phi,m)-(1-s2)*ellipPi(s2,phi,m)
     (n,xphi) = np.divmod(phi+np.pi/2, np.pi)
     xphi -= np.pi/2           #  phi == xphi + n*pi   &&   -pi/2 <= xphi < pi/2
-    s = 1 - 2*(n%2)           #  s = (-1)^n
     sg = np.sign(xphi)
     
     def ellipP_(z,m):
-        if z==0 and m==1:
-            sq = np.sqrt(s2)
-            return sq*np.arctanh(sq)
-        else:
-            return s2*elliprf(z+m-1,z,z+m)-(1-s2)*s2*elliprj(z+m-1,z,z+m,z+m-s2)/3
-
-    if xphi==0:   # probably a test like 'abs(xphi)<verysmall' would be safer...
-        e = 0
-    else:
-        c = np.square(1/np.sin(xphi))
-        z = max(0,c-m)
-        #e = sg*(s2*elliprf(z+m-1,z,z+m)-(1-s2)*s2*elliprj(z+m-1,z,z+m,z+m-s2)/3)
-        e = sg*ellipP_(z,m)
-    if n==0:
-        k = 0
-    else:
-        z = max(0,1-m)
-        #k = s2*elliprf(z+m-1,z,z+m)-(1-s2)*s2*elliprj(z+m-1,z,z+m,z+m-s2)/3
-        k = ellipP_(z,m)
+        z, m, s = np.broadcast_arrays(z, m, s2)
+        ok = (z!=0) | (m!=1)      # Carlson integrals evaluated only there (no 'invalid value' warning)
+        sq = np.sqrt(s)
+        p = sq*np.arctanh(sq)
+        z, m, s = z[ok], m[ok], s[ok]
+        p[ok] = s*elliprf(z+m-1,z,z+m)-(1-s)*s*elliprj(z+m-1,z,z+m,z+m-s)/3
+        return p
+
+    nz = xphi!=0              # probably a test like 'abs(xphi)<verysmall' would be safer...
+    c = np.square(1/np.sin(np.where(nz,xphi,np.pi/2)))
+    z = np.maximum(0,c-m)
+    e = np.where(nz, sg*ellipP_(z,m), 0)
+    z = np.maximum(0,1-m)
+    k = np.where(n!=0, ellipP_(z,m), 0)
     return 2*n*k + e
 
 
@@ -193,15 +217,18 @@ def ellipP(s2,phi,m):     # = ellipF(phi,m)-(1-s2)*ellipPi(s2,phi,m)
 #    p = sin_phi*sin_lon*sin_obl
 #    s = np.maximum( 0, 1 - sin_phi*sin_phi - sin_lon*sin_lon*sin_obl*sin_obl )
 #    ac = arccos( -p/sqrt(s+p*p) ) = hour (in radians) of sunrise/sunset
+#  Note:
+#    a and b can be scalars or numpy arrays (broadcast together), so that a whole
+#    time series is computed in a single call; the degenerate cases (sp2 == 0 or sb2 == 0)
+#    are masked with np.where instead of tested one value at a time
 #
 def inso_ac(a,b):
-    s = max(0,1-a*a-b*b)
+    s = np.maximum(0,1-a*a-b*b)
     p = a*b
     sp2 = s+p*p
-    if sp2>0 :
-        return s, p, np.arccos( -p/np.sqrt(sp2) )
-    else:
-        return s, p, np.pi/2
+    ok = sp2>0
+    ac = np.arccos( -p/np.sqrt(np.where(ok,sp2,1)) )
+    return s, p, np.where(ok, ac, np.pi/2)
 #
 #  dimensionless dayly inso at distance 'semi-major axis' of the Sun
 #
@@ -214,10 +241,9 @@ def inso_g(a,b):
 def inso_h(a,b):
     s,p,ac = inso_ac( a,b )  #np.arccos( -a*b/np.sqrt(s+a*b*a*b) )
     sb2 = s+b*b
-    if sb2>0 :
-        return (np.arccos( -b/np.sqrt(sb2) ) + b*np.sqrt(s) - a*(1-b*b)*ac)/np.pi/2 + (a-1)/4
-    else:
-        return b/4
+    ok = sb2>0
+    h = (np.arccos( -b/np.sqrt(np.where(ok,sb2,1)) ) + b*np.sqrt(s) - a*(1-b*b)*ac)/np.pi/2 + (a-1)/4
+    return np.where(ok, h, b/4)
 
 def inso_irrad(lon,phi,eps):
     sineps = np.sin(eps)
@@ -256,11 +282,8 @@ def inso_length_of_day(lon,phi,eps):
 def inso_radians(h,lon,phi,eps,e,per):
     sindelta = np.sin(lon)*np.sin(eps)
     g = np.sin(phi)*sindelta + np.cos(h)*np.sin(phi)*np.sqrt(1-sindelta*sindelta)
-    if g<=0:
-        return 0
-    else:
-        ar = (1-e*np.cos(lon-per))/(1-e*e)    # ratio a/r
-        return ar*ar*g
+    ar = (1-e*np.cos(lon-per))/(1-e*e)    # ratio a/r
+    return np.where(g>0, ar*ar*g, 0)
 
 ###################
 #
@@ -271,6 +294,7 @@ def inso_radians(h,lon,phi,eps,e,per):
 #       eps: obliquity (radians)
 #       e: eccentricity
 #       per: true longitude of perihelion (=climatic precession) (radians)
+#   any input can be a numpy array: eps, e, per are typically whole time series
 #
 def inso_dayly_radians(lon,phi,eps,e,per):
     sineps = np.sin(eps)
@@ -285,6 +309,12 @@ def inso_dayly_radians(lon,phi,eps,e,per):
 #
 def inso_dayly_time_radians(tr,phi,eps,e,per,refL=0):
     return inso_dayly_radians(trueLongitude(tr,e,per,refL),phi,eps,e,per)
+#
+#   idem with
+#       day: calendar day (1 = January 1st, can be fractional)
+#
+def inso_dayly_calendar_radians(day,phi,eps,e,per):
+    return inso_dayly_radians(calendar_day_to_trueLongitude(day,e,per),phi,eps,e,per)
 
 ###################
 #
@@ -305,6 +335,18 @@ def inso_mean_time_radians(tr1,tr2,phi,eps,e,per,refL=0):
 #   ... the corresponding "Milankovitch" caloric seasons
 #          = mean between 1/4 of a year before (-π/2) and after (+π/2) the soltice (summer or winter) (π/2 or 3π/2 vs vernal point)
 #
+#
+#   ... the mean over calendar months
+#       month: 1 (January) to 12, can be a numpy array; for a climatology, give
+#              month[:,None] and time series eps[None,:], e[None,:], per[None,:]
+#              to get all the months at every time step in one call
+#
+def inso_monthly_mean_radians(month,phi,eps,e,per):
+    month = np.asarray(month)
+    tr1 = calendar_day_to_meanLongitude(month_start[month-1])
+    tr2 = calendar_day_to_meanLongitude(month_start[month])
+    return inso_mean_time_radians(tr1,tr2,phi,eps,e,per)
+
 def inso_caloric_summer_NH(phi,eps,e,per):
     return inso_mean_time_radians(-np.pi/2,np.pi/2,phi,eps,e,per,np.pi/2)
 
@@ -324,6 +366,23 @@ def inso_mean_lat_radians(lon,phi1,phi2,eps,e,per):
     g = (inso_h(sineps*sinlon,sinphi2) - inso_h(sineps*sinlon,sinphi1))/(sinphi2 - sinphi1)
     ar = (1-e*np.cos(lon-per))/(1-e*e)    # ratio a/r
     return ar*ar*g
+#
+#   idem for all the bands between successive edges, in one pass
+#       phi_edges: latitudes of the band edges (radians), shape (nedge,), distinct successive values
+#       (np.arange(-90,91,5)*deg_to_rad: the 36 bands of 5° from pole to pole)
+#   inso_h is evaluated once per edge, each band using the values of its 2 edges
+#   output: shape (nedge-1,) + shape of lon, eps, e, per broadcast together
+#
+def inso_mean_lat_bands_radians(lon,phi_edges,eps,e,per):
+    lon,eps,e,per = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (lon,eps,e,per)))
+    sinphi = np.sin(np.asarray(phi_edges, dtype=float)).reshape((-1,) + (1,)*lon.ndim)
+    dsinphi = np.diff(sinphi, axis=0)
+    if np.any(dsinphi == 0):
+        raise ValueError("The band edges must be distinct")
+    h = inso_h(np.sin(eps)*np.sin(lon), sinphi)             # (nedge,) + shape
+    g = np.diff(h, axis=0)/dsinphi
+    ar = (1-e*np.cos(lon-per))/(1-e*e)    # ratio a/r
+    return ar*ar*g
 
 
 
@@ -369,9 +428,7 @@ if __name__ == '__main__':
 
     #   print dayly inso, summer solstice 65°N, at time t1 = 0 (today)
     print("dayly inso, summer solstice 65°N = ",solar_constante*inso_dayly_radians(trueLon,latitude,obl[-1],ecc[-1],pre[-1]))
-    inso65 = np.empty(len(t))
-    for i in range(len(t)):
-        inso65[i] = solar_constante*inso_dayly_radians(trueLon,latitude,obl[i],ecc[i],pre[i])
+    inso65 = solar_constante*inso_dayly_radians(trueLon,latitude,obl,ecc,pre)
     plt.plot(-t,inso65)
     plt.show()
 
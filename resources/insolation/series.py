@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Astronomical and insolation series, as produced by the insolation window
+
+    serie_description: short name and history of a serie
+    compute_serie: one vectorized evaluation over the whole time axis
+                   (the indices integrated over the year come from indices.py)
+    compute_serie_parallel: same, with the time axis split in chunks computed by a process pool,
+                            each worker writing its chunk directly in a shared-memory output
+    extend_serie: reuse a serie computed on an overlapping grid of same step, computing only the new steps
+    get_serie: read the serie from the persistent cache, or compute and store it
+"""
+import os
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+
+from . import inso
+from . import astro
+from . import cache
+from . import indices
+
+deg_to_rad = np.pi/180.
+
+#   quantity -> y label
+quantities = OrderedDict([
+    ("Eccentricity", "Eccentricity [degrees]"),
+    ("Obliquity", "Obliquity [degrees]"),
+    ("Precession angle", "Precession angle [degrees]"),
+    ("Precession parameter", "Precession parameter [degrees]"),
+    ("Daily insolation", "Insolation [W/m2]"),
+    ("Daily insolation on a calendar day", "Insolation [W/m2]"),
+    ("Daily insolation averaged over a latitude band", "Insolation [W/m2]"),
+    ("Monthly mean insolation", "Insolation [W/m2]"),
+    ("Integrated insolation between 2 true longitudes", "Insolation [W/m2]"),
+    ("Caloric summer insolation", "Insolation [W/m2]"),
+    ("Caloric winter insolation", "Insolation [W/m2]"),
+    ("Mean annual insolation", "Insolation [W/m2]"),
+    ("Summer energy above threshold", "Energy [GJ/m2]"),
+    ("Latitudinal insolation gradient", "Insolation difference [W/m2]"),
+])
+
+#   quantity -> parameters it depends on
+quantity_parameters = {
+    "Daily insolation": ("solar_constant", "latitude", "trueLongitude1"),
+    "Daily insolation on a calendar day": ("solar_constant", "latitude", "day"),
+    "Daily insolation averaged over a latitude band": ("solar_constant", "latitude", "latitude2", "trueLongitude1"),
+    "Monthly mean insolation": ("solar_constant", "latitude", "month"),
+    "Integrated insolation between 2 true longitudes": ("solar_constant", "latitude", "trueLongitude1", "trueLongitude2"),
+    "Caloric summer insolation": ("solar_constant", "latitude"),
+    "Caloric winter insolation": ("solar_constant", "latitude"),
+    "Mean annual insolation": ("solar_constant", "latitude"),
+    "Summer energy above threshold": ("solar_constant", "latitude", "threshold"),
+    "Latitudinal insolation gradient": ("solar_constant", "latitude", "latitude2"),
+}
+#   quantity -> orbital elements it needs (default: all, for the insolation quantities)
+quantity_elements = {
+    "Eccentricity": ('eccentricity',),
+    "Obliquity": ('obliquity',),
+    "Precession angle": ('precession_angle',),
+    "Precession parameter": ('eccentricity', 'precession_angle'),
+}
+def available_quantities(solution):
+    """quantities that the solution (name or instance) can give, in the order of quantities"""
+    provided = (astro.solutions[solution] if isinstance(solution, str) else solution).provided
+    return [quantity for quantity in quantities
+            if set(quantity_elements.get(quantity, astro.elements_dtype.names[:3])) <= set(provided)]
+
+default_parameters = dict(solar_constant=1365, latitude=65, trueLongitude1=90, trueLongitude2=180, day=172, month=6,
+                          threshold=275, latitude2=25)
+months = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+#
+#   t: time in kyr (past < 0), latitude and true longitudes in degrees,
+#   day: calendar day (1 = January 1st, 172 = June 21st), month: 1 (January) to 12,
+#   threshold: dayly insolation (W/m2) above which the summer energy is counted, latitude2: in degrees
+#
+def compute_serie(solution, quantity, t, solar_constant=1365, latitude=65, trueLongitude1=90, trueLongitude2=180,
+                  day=172, month=6, threshold=275, latitude2=25):
+
+    astro_params = astro.get_solution(solution) if isinstance(solution, str) else solution
+    t = np.asarray(t, dtype=float)
+
+    if quantity in quantities and quantity not in available_quantities(astro_params):
+        raise ValueError(f"'{quantity}' is not available with the solution {astro.solution_name(astro_params)}")
+
+    if quantity == "Eccentricity":
+        return astro_params.eccentricity(t) / deg_to_rad
+    elif quantity == "Obliquity":
+        return astro_params.obliquity(t) / deg_to_rad
+    elif quantity == "Precession angle":
+        return astro_params.precession_angle(t) / deg_to_rad
+    elif quantity == "Precession parameter":
+        return astro_params.precession_parameter(t) / deg_to_rad
+
+    elements = astro_params.elements(t)
+    ecc, obl, pre = elements['eccentricity'], elements['obliquity'], elements['precession_angle']
+    phi = latitude*deg_to_rad
+
+    if quantity == "Daily insolation":
+        values = inso.inso_dayly_radians(trueLongitude1*deg_to_rad, phi, obl, ecc, pre)
+    elif quantity == "Daily insolation on a calendar day":
+        values = inso.inso_dayly_calendar_radians(day, phi, obl, ecc, pre)
+    elif quantity == "Daily insolation averaged over a latitude band":
+        if latitude == latitude2:                                           # empty band: its latitude
+            values = inso.inso_dayly_radians(trueLongitude1*deg_to_rad, phi, obl, ecc, pre)
+        else:
+            values = inso.inso_mean_lat_bands_radians(trueLongitude1*deg_to_rad, [phi, latitude2*deg_to_rad], obl, ecc, pre)[0]
+    elif quantity == "Monthly mean insolation":
+        values = inso.inso_monthly_mean_radians(month, phi, obl, ecc, pre)
+    elif quantity == "Integrated insolation between 2 true longitudes":
+        values = inso.inso_mean_radians(trueLongitude1*deg_to_rad, trueLongitude2*deg_to_rad, phi, obl, ecc, pre)
+    elif quantity == "Caloric summer insolation":
+        values = inso.inso_caloric_summer_NH(phi, obl, ecc, pre)
+    elif quantity == "Caloric winter insolation":
+        values = inso.inso_caloric_winter_NH(phi, obl, ecc, pre)
+    elif quantity == "Mean annual insolation":
+        return indices.mean_annual_insolation(phi, obl, ecc, pre, solar_constant)[:,0]
+    elif quantity == "Summer energy above threshold":
+        return indices.summer_energy(phi, obl, ecc, pre, threshold, solar_constant)[:,0]
+    elif quantity == "Latitudinal insolation gradient":
+        return indices.latitudinal_gradient(phi, latitude2*deg_to_rad, obl, ecc, pre, solar_constant)
+    else:
+        raise ValueError(f"Unknown quantity '{quantity}'")
+
+    return solar_constant * values
+
+#
+#   (short name, history) of a serie, as recorded in the worksheets
+#
+def serie_description(quantity, solar_constant=1365, latitude=65, trueLongitude1=90, trueLongitude2=180,
+                      day=172, month=6, threshold=275, latitude2=25):
+
+    if quantity in ["Eccentricity", "Obliquity", "Precession angle", "Precession parameter"]:
+        history = f'Astronomical serie "{quantity}"'
+        shortName = f"{quantity} [degrees]"
+
+    elif quantity == "Daily insolation":
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude [°]: {latitude}' + \
+                    f'<li>True longitude [°]: {trueLongitude1}' + \
+                    '</ul>'
+        shortName = "Daily insolation [W/m2]"
+
+    elif quantity == "Daily insolation on a calendar day":
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude [°]: {latitude}' + \
+                    f'<li>Calendar day: {day}' + \
+                    '</ul>'
+        shortName = "Daily insolation [W/m2]"
+
+    elif quantity == "Daily insolation averaged over a latitude band":
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude #1 [°]: {latitude}' + \
+                    f'<li>Latitude #2 [°]: {latitude2}' + \
+                    f'<li>True longitude [°]: {trueLongitude1}' + \
+                    '</ul>'
+        shortName = f"Daily insolation {min(latitude, latitude2)}° to {max(latitude, latitude2)}° [W/m2]"
+
+    elif quantity == "Monthly mean insolation":
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude [°]: {latitude}' + \
+                    f'<li>Month: {months[month-1]}' + \
+                    '</ul>'
+        shortName = f"{months[month-1]} mean insolation [W/m2]"
+
+    elif quantity == "Integrated insolation between 2 true longitudes":
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude [°]: {latitude}' + \
+                    f'<li>True longitude #1 [°]: {trueLongitude1}' + \
+                    f'<li>True longitude #2 [°]: {trueLongitude2}' + \
+                    '</ul>'
+        shortName = "Integrated insolation [W/m2]"
+
+    elif quantity == "Mean annual insolation":
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude [°]: {latitude}' + \
+                    '</ul>'
+        shortName = "Mean annual insolation [W/m2]"
+
+    elif quantity == "Summer energy above threshold":
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude [°]: {latitude}' + \
+                    f'<li>Threshold [W/m2]: {threshold}' + \
+                    '</ul>'
+        shortName = f"Summer energy above {threshold} W/m2 [GJ/m2]"
+
+    elif quantity == "Latitudinal insolation gradient":
+        history = f'Insolation serie "{quantity}" (mean annual insolation at latitude #1 minus latitude #2) with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude #1 [°]: {latitude}' + \
+                    f'<li>Latitude #2 [°]: {latitude2}' + \
+                    '</ul>'
+        shortName = f"Mean annual insolation {latitude}° - {latitude2}° [W/m2]"
+
+    elif quantity in ["Caloric summer insolation", "Caloric winter insolation"]:
+        history = f'Insolation serie "{quantity}" with parameters :' + \
+                    '<ul>' + \
+                    f'<li>Solar constant [W/m2]: {solar_constant}' + \
+                    f'<li>Latitude [°]: {latitude}' + \
+                    '</ul>'
+        shortName = f"{quantity} [W/m2]"
+
+    else:
+        raise ValueError(f"Unknown quantity '{quantity}'")
+
+    return shortName, history
+
+#
+#   chunked execution over a process pool
+#       workers: number of processes (None = number of CPUs), 1 = serial
+#       chunk_size: number of time steps per task
+#       progress: optional callback, called with the fraction done after each chunk
+#       cancelled: optional callable, checked between chunks; Cancelled is raised when it returns True
+#   The workers are never forked from the calling process, which may be multithreaded (GUI worker
+#   thread, locks of the registry, malloc, BLAS...): they are forked from a fork server (started
+#   once, single-threaded, with the insolation modules preloaded), or spawned where it is not
+#   available. If the pool cannot be started, the computation falls back to serial.
+#
+default_chunk_size = 20000
+
+class Cancelled(Exception):
+    pass
+
+def compute_serie_parallel(solution, quantity, t, workers=None, chunk_size=default_chunk_size,
+                           progress=None, cancelled=None, **params):
+    """compute_serie over a process pool; the main script of the calling program must be guarded by
+    if __name__ == '__main__': since the workers import it (otherwise the computation is serial)"""
+
+    t = np.asarray(t, dtype=float)
+    workers = workers or os.cpu_count() or 1
+    chunks = [(start, min(start+chunk_size, len(t))) for start in range(0, len(t), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return _compute_serial(solution, quantity, t, chunks, progress, cancelled, params)
+
+    name = astro.solution_name(solution)
+    shm = shared_memory.SharedMemory(create=True, size=t.nbytes)
+    try:
+        values = np.ndarray(t.shape, dtype=float, buffer=shm.buf)
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                     mp_context=_mp_context()) as pool:
+                futures = [pool.submit(_compute_chunk, shm.name, len(t), start, end, t[start:end], name, quantity, params)
+                           for start, end in chunks]
+                for i, future in enumerate(as_completed(futures)):
+                    future.result()
+                    if cancelled is not None and cancelled():
+                        for f in futures:
+                            f.cancel()
+                        raise Cancelled()
+                    if progress is not None:
+                        progress((i+1)/len(chunks))
+        except (OSError, RuntimeError, BrokenProcessPool):        # RuntimeError: unguarded main script
+            return _compute_serial(solution, quantity, t, chunks, progress, cancelled, params)
+        result = values.copy()
+        del values
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
+
+def _mp_context():
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload([__name__, astro.__name__, inso.__name__])
+    return context
+
+def _compute_serial(solution, quantity, t, chunks, progress, cancelled, params):
+    if progress is None and cancelled is None:
+        return compute_serie(solution, quantity, t, **params)
+    values = np.empty(len(t))
+    for i, (start, end) in enumerate(chunks):
+        if cancelled is not None and cancelled():
+            raise Cancelled()
+        values[start:end] = compute_serie(solution, quantity, t[start:end], **params)
+        if progress is not None:
+            progress((i+1)/len(chunks))
+    return values
+
+def _compute_chunk(shm_name, n, start, end, t, solution, quantity, params):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        values = np.ndarray((n,), dtype=float, buffer=shm.buf)
+        values[start:end] = compute_serie(astro.get_solution(solution), quantity, t, **params)
+        del values
+    finally:
+        shm.close()
+
+#
+#   serie on the grid t from the serie (t_prev, values_prev) of the same quantity and parameters
+#       the grids must have the same step and be aligned (t[0]-t_prev[0] multiple of the step):
+#       the overlapping values are copied, only the steps before and after are computed
+#       returns None when the grids cannot be spliced
+#
+def extend_serie(solution, quantity, t, t_prev, values_prev, workers=1, chunk_size=default_chunk_size,
+                 progress=None, cancelled=None, **params):
+    t = np.asarray(t, dtype=float)
+    if len(t) < 2 or len(t_prev) < 2:
+        return None
+    dt = t[1] - t[0]
+    if not np.isclose(dt, t_prev[1] - t_prev[0], rtol=1e-9, atol=0):
+        return None
+    offset = (t[0] - t_prev[0])/dt
+    k = int(np.rint(offset))                  # t[i] == t_prev[i+k]
+    if abs(offset - k) > 1e-6:
+        return None
+    i0 = max(0, -k)
+    i1 = min(len(t), len(t_prev) - k)
+    if i1 <= i0:
+        return None
+
+    values = np.empty(len(t))
+    values[i0:i1] = values_prev[i0+k:i1+k]
+    n_new = i0 + len(t) - i1
+    if i0 > 0:
+        values[:i0] = compute_serie_parallel(solution, quantity, t[:i0], workers=workers, chunk_size=chunk_size,
+                                             progress=_scaled(progress, 0, i0/n_new), cancelled=cancelled, **params)
+    if i1 < len(t):
+        values[i1:] = compute_serie_parallel(solution, quantity, t[i1:], workers=workers, chunk_size=chunk_size,
+                                             progress=_scaled(progress, i0/n_new, 1-i0/n_new), cancelled=cancelled, **params)
+    return values
+
+def _scaled(progress, offset, scale):
+    if progress is None:
+        return None
+    return lambda fraction: progress(offset + scale*fraction)
+
+#
+#   serie from the persistent cache, computed (and stored) on a miss
+#       previous: optional (t_prev, values_prev) of the same quantity and parameters, used by extend_serie
+#       returns (values, hit)
+#
+def get_serie(solution, quantity, t, serieCache=cache.cache, workers=1, chunk_size=default_chunk_size, previous=None,
+              progress=None, cancelled=None, **params):
+    t = np.asarray(t, dtype=float)
+    used = {k: params.get(k, default_parameters[k]) for k in quantity_parameters.get(quantity, ())}
+    key = serieCache.key(astro.solution_name(solution), quantity, t, **used)
+    values = serieCache.get(key)
+    if values is not None:
+        return values, True
+    if previous is not None:
+        values = extend_serie(solution, quantity, t, *previous, workers=workers, chunk_size=chunk_size,
+                              progress=progress, cancelled=cancelled, **params)
+    if values is None:
+        values = compute_serie_parallel(solution, quantity, t, workers=workers, chunk_size=chunk_size,
+                                        progress=progress, cancelled=cancelled, **params)
+    serieCache.put(key, values)
+    return values, False
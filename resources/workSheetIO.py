@@ -0,0 +1,656 @@
+#========================================================================================
+# Worksheet files reading and writing, without GUI
+#
+#   read_WorkSheet: the workbook is opened once (openpyxl read-only mode) and each sheet
+#                   is streamed row by row into the item dicts of the tree
+#   write_WorkSheet: the workbook is written in openpyxl write-only mode, each sheet row by
+#                    row from the columns (arrays) of the item dicts, the column widths being
+#                    computed from a sample of the values (workSheetLayout, without PyQt5, also
+#                    used by the command-line insolation generator)
+#
+#   lazy series: read_WorkSheet(lazy=True) reads only the header and the 2nd row of the Serie
+#                   sheets of a xlsx worksheet, the data columns being read on first access
+#                   (LazyItemDict) and then kept in a cache of limited size, backed by weak references
+#
+#   binary worksheet (.pyas): uncompressed zip of a JSON manifest (metadata of the items,
+#                   one entry per sheet of the xlsx layout) and of .npy arrays (numerical
+#                   columns), read with memory mapping (copied in memory by release_source before
+#                   the file is overwritten); recognized from its content, so that both formats
+#                   are read by read_WorkSheet, and written for the .pyas extension
+#
+#   threads: the files are read and written in worker threads (workSheetWorker), the lazy items
+#                   being possibly read at the same time from the GUI thread
+#
+#   cell values follow pandas.read_excel(na_filter=False), as read before:
+#       empty cells are '', integral numbers are int, and duplicated headers are renamed
+#========================================================================================
+
+import os
+import json
+import struct
+import tempfile
+import weakref
+import zipfile
+import threading
+import numpy as np
+import pandas as pd
+
+from itertools import islice
+from collections import OrderedDict
+
+from openpyxl import load_workbook
+
+from PyQt5.QtGui import QColor
+
+from resources.misc import *
+from resources.workSheetLayout import sheet_name, write_xlsx_WorkSheet
+
+#========================================================================================
+def convert_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+#========================================================================================
+def read_sheet(ws, max_row=None):
+    """Header and columns (lists) of a sheet, the columns padded with ''"""
+
+    rows = [[convert_cell(value) for value in row] for row in islice(ws.iter_rows(values_only=True), max_row)]
+    while rows and all(value == '' for value in rows[-1]):         # trailing empty rows
+        rows.pop()
+    if not rows:
+        return [], []
+
+    width = max(len(row) for row in rows)
+    header = rows[0] + [''] * (width - len(rows[0]))
+    while width > 0 and header[width-1] == '' and all(len(row) < width or row[width-1] == '' for row in rows):
+        width -= 1                                                  # trailing empty columns
+    header = header[:width]
+
+    names = []
+    for i, name in enumerate(header):
+        if name == '':
+            name = f'Unnamed: {i}'
+        if name in names:                                           # same renaming as pandas
+            k = 1
+            while f'{name}.{k}' in names: k += 1
+            name = f'{name}.{k}'
+        names.append(name)
+
+    columns = [[] for _ in range(width)]
+    for row in rows[1:]:
+        row = row[:width] + [''] * (width - len(row))
+        for column, value in zip(columns, row):
+            column.append(value)
+
+    return names, columns
+
+#========================================================================================
+def serie_itemDict(sheetName, names, columns):
+    col = dict(zip(names, columns))
+
+    color = QColor(col['Color'][0])
+    if color.isValid():
+        Color = col['Color'][0]
+    else:
+        Color = generate_color()
+
+    serieDict = {
+        'Id': 'Id-' + sheetName.split('Serie Id-')[1],
+        'Type': col['Type'][0],
+        'Name': col['Name'][0],
+        'X':  names[0],
+        'Y':  names[1],
+        'Y axis inverted': bool(col['Y axis inverted'][0]),
+        'Color': Color,
+        'Comment': col['Comment'][0],
+        'History': col['History'][0],
+        'Serie': pd.Series(addNanList(columns[1]), index=addNanList(columns[0]))
+    }
+
+    if 'InterpolationMode' in col:
+        serieDict = serieDict | {
+            'InterpolationMode': col['InterpolationMode'][0],
+            'X1Coords': cleanSpaceList(col['X1Coords']),
+            'X2Coords': cleanSpaceList(col['X2Coords']),
+            'XOriginal': names[11],
+            'XOriginalValues': addNanList(columns[11])
+        }
+
+    return serieDict
+
+def filter_itemDict(sheetName, names, columns):
+    col = dict(zip(names, columns))
+
+    filterDict = {
+            'Id': 'Id-' + sheetName.split('Id-')[1],
+            'Type': col['Type'][0],
+            'Name': col['Name'][0],
+            'Parameters': str(col['Parameters'][0]),
+            'Comment': col['Comment'][0],
+            'History': col['History'][0]
+    }
+
+    if 'XCoords' in col:                 # for SAMPLE
+        filterDict = filterDict | {
+            'XCoords': addNanList(col['X2Coords'])
+        }
+
+    return filterDict
+
+def interpolation_itemDict(sheetName, names, columns):
+    col = dict(zip(names, columns))
+
+    return {
+            'Id': 'Id-' + sheetName.split('INTERPOLATION Id-')[1],
+            'Type': col['Type'][0],
+            'Name': col['Name'][0],
+            'X1Coords': pd.Series(col['X1Coords']).values,
+            'X2Coords': pd.Series(col['X2Coords']).values,
+            'X1Name': col['X1Name'][0],
+            'Comment': col['Comment'][0],
+            'History': col['History'][0]
+    }
+
+#========================================================================================
+def read_WorkSheet(fileName, lazy=False, progress=None):
+    """(item dicts, error messages) of a worksheet file, the messages for the wrongly formatted sheets
+    lazy: the series of a xlsx file are LazyItemDict, their data being read on first access
+    progress: called with (sheets read, number of sheets) after each sheet"""
+
+    if is_binary_WorkSheet(fileName):
+        return read_binary_WorkSheet(fileName, progress)
+
+    itemDict_list = []
+    messages = []
+
+    wb = load_workbook(fileName, read_only=True, data_only=True)
+    try:
+        for n, sheetName in enumerate(wb.sheetnames):
+
+            if progress:
+                progress(n, len(wb.sheetnames))
+
+            if sheetName.startswith('Serie Id-'):
+                builder = serie_itemDict
+                msg = f"The file '{fileName}' contains a serie that is wrongly formatted in {sheetName} sheet."
+            elif sheetName.startswith('FILTER Id-') or  sheetName.startswith('SAMPLE Id-'):
+                builder = filter_itemDict
+                msg = f"The file '{fileName}' contains a FILTER/SAMPLE that is wrongly formatted in {sheetName} sheet."
+            elif sheetName.startswith('INTERPOLATION Id-'):
+                builder = interpolation_itemDict
+                msg = f"The file '{fileName}' contains an INTERPOLATION that is wrongly formatted in {sheetName} sheet."
+            else:
+                continue
+
+            try:
+                if lazy and builder is serie_itemDict:
+                    names, columns = read_sheet(wb[sheetName], max_row=2)
+                    itemDict_list.append(LazyItemDict(builder(sheetName, names, columns), get_source(fileName), sheetName))
+                else:
+                    names, columns = read_sheet(wb[sheetName])
+                    itemDict_list.append(builder(sheetName, names, columns))
+            except Exception:
+                messages.append(msg)
+
+        if progress:
+            progress(len(wb.sheetnames), len(wb.sheetnames))
+    finally:
+        wb.close()
+
+    return itemDict_list, messages
+
+#========================================================================================
+# Lazy series
+#
+#   WorkSheetSource: xlsx file the lazy items have been read from, kept open in read-only mode
+#                    (renamed with the worksheet, released before the file is overwritten)
+#   DataCache: data columns of the last used sheets, up to cache_size bytes, plus weak references
+#              to all the ones still in use elsewhere (plots, filters...)
+#   LazyItemDict: item dict whose data columns (lazy_keys) are read on first access
+#========================================================================================
+lazy_keys = ['Serie', 'X1Coords', 'X2Coords', 'XOriginalValues']
+cache_size = 512 * 2**20
+
+class Column(list):
+    """List of a data column, that can be weakly referenced"""
+
+class SheetData(dict):
+    """Data columns of a sheet, that can be weakly referenced"""
+
+    def nbytes(self):
+        nbytes = 0
+        for value in self.values():
+            nbytes += value.memory_usage(index=True) if isinstance(value, pd.Series) else 8*len(value)
+        return nbytes
+
+#========================================================================================
+class DataCache:
+
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.strong = OrderedDict()                     # key -> (SheetData, nbytes), last used at the end
+        self.weak = weakref.WeakValueDictionary()       # key -> SheetData
+        self.nbytes = 0
+
+    def get(self, key):
+        with self.lock:
+            data = self.weak.get(key)
+            if data is not None and key in self.strong:
+                self.strong.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self.lock:
+            self.weak[key] = data
+            if key in self.strong:
+                self.nbytes -= self.strong.pop(key)[1]
+            nbytes = data.nbytes()
+            self.strong[key] = (data, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.size and len(self.strong) > 1:
+                self.nbytes -= self.strong.popitem(last=False)[1][1]
+
+    def discard(self, source):
+        with self.lock:
+            for key in [key for key in self.strong if key[0] is source]:
+                self.nbytes -= self.strong.pop(key)[1]
+            for key in [key for key in self.weak.keys() if key[0] is source]:
+                self.weak.pop(key, None)
+
+cache = DataCache(cache_size)
+
+#========================================================================================
+class WorkSheetSource:
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.items = weakref.WeakValueDictionary()      # id -> lazy item read from this file
+        self.lock = threading.Lock()
+        self.released = None                            # {sheet name: SheetData} once released
+        self.wb = None                                  # read-only workbook, kept open for the next sheets
+
+    def close(self):
+        if self.wb is not None:
+            self.wb.close()
+            self.wb = None
+
+    def read(self, sheetNames):
+        """{sheet name: SheetData}, from the workbook opened once (the lock being held)"""
+        if self.wb is None:
+            self.wb = load_workbook(self.fileName, read_only=True, data_only=True)
+        datas = {}
+        for sheetName in sheetNames:
+            names, columns = read_sheet(self.wb[sheetName])
+            itemDict = serie_itemDict(sheetName, names, columns)
+            datas[sheetName] = SheetData({key: Column(value) if isinstance(value, list) else value
+                                          for key, value in itemDict.items() if key in lazy_keys})
+        return datas
+
+    def data(self, sheetName):
+        with self.lock:                                 # a sheet is read once, even from several threads
+            if self.released is not None:               # the file may be being overwritten
+                return self.released[sheetName]
+            key = (self, sheetName)
+            data = cache.get(key)
+            if data is None:
+                data = self.read([sheetName])[sheetName]
+                cache.put(key, data)
+            return data
+
+sources = {}                                            # file name -> WorkSheetSource
+mapped = {}                                             # file name -> id -> item dict memory mapped from it
+sources_lock = threading.Lock()
+
+def get_source(fileName):
+    fileName = os.path.abspath(fileName)
+    with sources_lock:
+        if fileName not in sources:
+            sources[fileName] = WorkSheetSource(fileName)
+        return sources[fileName]
+
+def close_source(fileName):
+    """To be called before fileName is renamed: its workbook is opened again when needed"""
+    with sources_lock:
+        source = sources.get(os.path.abspath(fileName))
+    if source:
+        with source.lock:
+            source.close()
+
+def rename_source(oldFileName, newFileName):
+    """To be called when the file of a worksheet is renamed"""
+    with sources_lock:
+        source = sources.pop(os.path.abspath(oldFileName), None)
+        if source:
+            source.fileName = os.path.abspath(newFileName)
+            sources[source.fileName] = source
+        items = mapped.pop(os.path.abspath(oldFileName), None)
+        if items is not None:
+            mapped[os.path.abspath(newFileName)] = items
+
+def release_source(fileName):
+    """To be called before fileName is overwritten: the lazy items read from it are fully read,
+    and the arrays of the items of a binary worksheet are copied in memory (a mapped file
+    can't be replaced on Windows)"""
+    with sources_lock:
+        source = sources.pop(os.path.abspath(fileName), None)
+        items = mapped.pop(os.path.abspath(fileName), {})
+    for itemDict in list(items.values()):
+        itemDict.materialize()
+    if source is None:
+        return
+    with source.lock:                                   # items being read in other threads get the same data
+        items = [item for item in list(source.items.values()) if item.lazy]
+        source.released = source.read({item.sheetName for item in items}) if items else {}
+        source.close()
+    for item in items:
+        item.materialize(source.released[item.sheetName])
+    cache.discard(source)
+
+def attach_source(fileName, itemDict_list, saved_list):
+    """To be called after fileName has been written from saved_list (copies of the item dicts of
+    itemDict_list): its lazy items read from a released file, and not changed since, are again read
+    from fileName when needed"""
+    if is_binary_WorkSheet(fileName):                   # arrays memory mapped instead
+        return
+    source = None
+    for itemDict, saved in zip(itemDict_list, saved_list):
+        if not isinstance(itemDict, LazyItemDict) or itemDict.source is not None:
+            continue
+        if sheet_name(itemDict) != sheet_name(saved):
+            continue
+        if any(dict.get(itemDict, key) is not saved.get(key) for key in lazy_keys):      # changed while saved
+            continue
+        source = source or get_source(fileName)
+        itemDict.attach(source, sheet_name(itemDict))
+
+#========================================================================================
+class LazyItemDict(dict):
+    """Item dict of a serie whose data columns are read from the worksheet file on first access
+
+    The data columns are kept in the dict as None; __getitem__, get, items, values and
+    the copies (|, dict(), **) give the data, so that the rest of the application can use it
+    as a plain dict. Setting a data column replaces the lazy one."""
+
+    on_load = None                                      # called with the item dict when its data is read
+
+    def __init__(self, itemDict, source, sheetName):
+        super().__init__(itemDict)
+        self.source = source
+        self.sheetName = sheetName
+        self.lazy = {key: None for key in lazy_keys if key in self}     # key -> weak reference once read
+        for key in self.lazy:
+            super().__setitem__(key, None)
+        source.items[id(self)] = self
+
+    def attach(self, source, sheetName):
+        """Read again from source, the current data columns being put in the cache"""
+        data = SheetData({key: (value if isinstance(value, (pd.Series, Column)) else Column(value))
+                          for key, value in dict(self).items() if key in lazy_keys})
+        cache.put((source, sheetName), data)
+        self.source = source
+        self.sheetName = sheetName
+        self.lazy = {key: weakref.ref(value) for key, value in data.items()}
+        for key in self.lazy:
+            super().__setitem__(key, None)
+        source.items[id(self)] = self
+
+    def materialize(self, data=None):
+        """Keep the data columns in the dict (read from data if given)"""
+        for key in list(self.lazy):
+            super().__setitem__(key, data[key] if data is not None else self.lazy_value(key))
+        self.lazy = {}
+        self.source = None
+
+    def is_loaded(self, key='Serie'):
+        ref = self.lazy.get(key)
+        return key not in self.lazy or (ref is not None and ref() is not None)
+
+    def lazy_value(self, key):
+        lazy, source = self.lazy, self.source           # both replaced if materialized by another thread
+        ref = lazy.get(key)
+        value = ref() if ref is not None else None
+        if value is None:
+            if source is None:
+                return super().__getitem__(key)
+            first = any(ref is None for ref in lazy.values())
+            data = source.data(self.sheetName)
+            for k in lazy:
+                lazy[k] = weakref.ref(data[k])
+            value = data[key]
+            if first and LazyItemDict.on_load:
+                LazyItemDict.on_load(self)
+        return value
+
+    def __getitem__(self, key):
+        if key in self.lazy:
+            return self.lazy_value(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self.lazy.pop(key, None)
+        super().__setitem__(key, value)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):                                 # copies by dict() and ** then use __getitem__
+        return iter(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def copy(self):
+        return self | {}
+
+    def __or__(self, other):
+        lazy = {key: ref for key, ref in self.lazy.items() if key not in other}
+        itemDict = dict(super().items()) | dict(other)
+        if not lazy:
+            return itemDict
+        new = LazyItemDict.__new__(LazyItemDict)
+        dict.__init__(new, itemDict)
+        new.lazy = lazy
+        new.source = self.source
+        new.sheetName = self.sheetName
+        self.source.items[id(new)] = new
+        return new
+
+#========================================================================================
+def write_WorkSheet(outFile, itemDict_list, version, progress=None):
+    """Worksheet file of the item dicts (same layout as read by read_WorkSheet)
+    progress: called with (sheets written, number of item dicts) after each sheet"""
+
+    if os.path.splitext(outFile)[1].lower() == binary_extension:
+        return write_binary_WorkSheet(outFile, itemDict_list, version, progress)
+
+    write_xlsx_WorkSheet(outFile, itemDict_list, version, progress)
+
+#========================================================================================
+# Binary worksheet
+#
+#   manifest.json: {"format", "version", "created", "items": [{"sheet": sheet name, "item": {key: value}}]}
+#       values: JSON values for the scalars (Type, Name, Color, History, ...), and
+#           {"serie": [index, values]}  pandas Series
+#           {"array": column}           numpy array (pointers of an INTERPOLATION)
+#           {"list": column}            list (pointers of an interpolated serie)
+#       column: name of a .npy member for numerical data, else {"json": [values]}
+#========================================================================================
+binary_extension = '.pyas'
+binary_format = 'PyAnalySeries binary worksheet'
+binary_version = 1
+manifest_name = 'manifest.json'
+
+def is_binary_WorkSheet(fileName):
+    if not zipfile.is_zipfile(fileName):
+        return False
+    with zipfile.ZipFile(fileName) as zf:
+        return manifest_name in zf.namelist()
+
+#========================================================================================
+def encode_column(zf, name, values):
+    values = np.asarray(values)
+    if values.dtype.kind not in 'biuf':                             # strings, '' of empty cells...
+        return {'json': values.tolist()}
+    with zf.open(name, 'w', force_zip64=values.nbytes > 2**30) as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(values), allow_pickle=False)
+    return name
+
+def encode_value(zf, name, value):
+    if isinstance(value, pd.Series):
+        value = value.sort_index()                                  # force sort on index, as in xlsx
+        return {'serie': [encode_column(zf, f'{name}/index.npy', value.index.to_numpy()),
+                          encode_column(zf, f'{name}/values.npy', value.to_numpy())]}
+    if isinstance(value, (np.ndarray, pd.Index, tuple)):
+        return {'array': encode_column(zf, f'{name}.npy', value)}
+    if isinstance(value, list):
+        value = [v.item() if isinstance(v, np.generic) else v for v in value]
+        if len(set(map(type, value))) == 1 and type(value[0]) in (int, float):   # same type back from tolist
+            return {'list': encode_column(zf, f'{name}.npy', value)}
+        return {'list': {'json': value}}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def write_binary_WorkSheet(outFile, itemDict_list, version, progress=None):
+    """Binary worksheet of the item dicts, written in a temporary file first: the arrays
+    of a worksheet read from outFile are memory mapped from it"""
+
+    items = []
+    fd, tmpFile = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(outFile)),
+                                   prefix=os.path.basename(outFile) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w+b') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as zf:
+            for itemDict in itemDict_list:
+                sheetName = sheet_name(itemDict)
+                items.append({'sheet': sheetName,
+                              'item': {key: encode_value(zf, f'{sheetName}/{key}', value) for key, value in itemDict.items()}})
+                if progress:
+                    progress(len(items), len(itemDict_list))
+            manifest = {'format': binary_format, 'version': binary_version,
+                        'created': f'Created with PyAnalyseries {version}', 'items': items}
+            zf.writestr(manifest_name, json.dumps(manifest, indent=1))
+        os.chmod(tmpFile, 0o644)                        # mkstemp files are private
+        os.replace(tmpFile, outFile)
+    except BaseException:
+        if os.path.exists(tmpFile):
+            os.remove(tmpFile)
+        raise
+
+#========================================================================================
+class MappedItemDict(dict):
+    """Item dict of a binary worksheet, whose numerical columns are memory mapped from the file"""
+
+    registry = None                                     # mapped[file name], the item dicts mapped from the file
+
+    def copy(self):
+        """Copy registered with the item dict, so that release_source copies its columns in memory too"""
+        new = MappedItemDict(self)
+        with sources_lock:
+            new.registry = self.registry
+            if self.registry is not None:
+                self.registry[id(new)] = new
+        return new
+
+    def materialize(self):
+        """Copy the columns in memory, the file being no longer mapped once the copies are the
+        only ones used"""
+        for key, value in self.items():
+            if isinstance(value, pd.Series):
+                index = pd.Index(np.array(value.index.to_numpy()), name=value.index.name)
+                self[key] = pd.Series(np.array(value.to_numpy()), index=index, name=value.name)
+            elif isinstance(value, np.ndarray):
+                self[key] = np.array(value)
+
+#========================================================================================
+def member_offset(f, info):
+    """Offset of the data of an uncompressed zip member, after its local header"""
+    f.seek(info.header_offset)
+    header = f.read(30)
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    return info.header_offset + 30 + name_length + extra_length
+
+def memmap_npy(fileName, f, offset):
+    f.seek(offset)
+    major, minor = np.lib.format.read_magic(f)
+    if (major, minor) == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    if np.prod(shape) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(fileName, dtype=dtype, mode='c', offset=f.tell(), shape=shape,
+                     order='F' if fortran_order else 'C')
+
+def read_binary_WorkSheet(fileName, progress=None):
+    """(item dicts, error messages) of a binary worksheet, the numerical columns memory mapped"""
+
+    with zipfile.ZipFile(fileName) as zf:
+        manifest = json.loads(zf.read(manifest_name))
+        infos = {info.filename: info for info in zf.infolist()}
+
+    itemDict_list = []
+    messages = []
+
+    with open(fileName, 'rb') as f:
+
+        def column(value):
+            if isinstance(value, dict):
+                return np.array(value['json'], dtype=object) if value['json'] else np.array([])
+            info = infos[value]
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f'{value} is compressed')
+            return memmap_npy(fileName, f, member_offset(f, info))
+
+        def decode(value):
+            if not isinstance(value, dict):
+                return value
+            if 'serie' in value:
+                index, values = (column(v) for v in value['serie'])
+                return pd.Series(values, index=pd.Index(index, copy=False), copy=False)
+            if 'array' in value:
+                return column(value['array'])
+            if 'list' in value:
+                if isinstance(value['list'], dict):
+                    return value['list']['json']
+                return column(value['list']).tolist()
+            raise ValueError(f'unknown value {value}')
+
+        for n, entry in enumerate(manifest['items']):
+            try:
+                itemDict_list.append(MappedItemDict({key: decode(value) for key, value in entry['item'].items()}))
+            except Exception:
+                messages.append(f"The file '{fileName}' contains an item that is wrongly formatted in {entry.get('sheet')} sheet.")
+            if progress:
+                progress(n+1, len(manifest['items']))
+
+    with sources_lock:
+        registry = mapped.setdefault(os.path.abspath(fileName), weakref.WeakValueDictionary())
+        for itemDict in itemDict_list:
+            itemDict.registry = registry
+            registry[id(itemDict)] = itemDict
+
+    return itemDict_list, messages
+
+#========================================================================================
+#   conversion between the 2 formats: python -m resources.workSheetIO in.xlsx out.pyas
+
+if __name__ == '__main__':
+
+    import sys
+
+    if len(sys.argv) != 3:
+        print('Usage: python -m resources.workSheetIO inFile outFile   (.xlsx or .pyas)')
+        sys.exit(1)
+
+    itemDict_list, messages = read_WorkSheet(sys.argv[1])
+    for msg in messages:
+        print(msg)
+    write_WorkSheet(sys.argv[2], itemDict_list, 'workSheetIO')
+    print(f'{len(itemDict_list)} item(s) written to {sys.argv[2]}')
@@ -0,0 +1,115 @@
+#========================================================================================
+# Layout of the xlsx worksheets: one sheet of columns per item dict, after an Information sheet
+#
+#   without PyQt5 import, so that the worksheets written by the command-line tools
+#   (python -m resources.insolation) have the same layout as the ones of the application
+#========================================================================================
+
+import numpy as np
+import pandas as pd
+
+from itertools import zip_longest
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+#========================================================================================
+def column_width(header, values, sample_size=1000):
+    """Width of a column from its header and a sample of its values (evenly spaced, first and last included)"""
+
+    n = len(values)
+    if n > sample_size:
+        values = [values[i] for i in np.linspace(0, n-1, sample_size).astype(int)]
+    max_length = max((len(str(value)) for value in [header, *values] if value), default=0)
+    return max_length + 5
+
+def set_dimension(ws, nrows, ncols):
+    """Size written in the sheet header (as a normal workbook does): without it, the read-only
+    readers parse the whole sheet to find it before reading any row"""
+    ref = f'A1:{get_column_letter(max(ncols, 1))}{max(nrows, 1)}'
+    ws.calculate_dimension = lambda: ref
+
+def write_sheet(wb, sheetName, columns, autofit=True):
+    """Sheet of columns [(header, values from row 2)], empty cells below the shortest columns"""
+
+    ws = wb.create_sheet(title=sheetName)
+    if autofit:
+        for i, (header, values) in enumerate(columns, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = column_width(header, values)
+    set_dimension(ws, 1 + max((len(values) for header, values in columns), default=0), len(columns))
+
+    ws.append([header for header, values in columns])
+    for row in zip_longest(*(values for header, values in columns)):
+        ws.append(row)
+
+def to_list(values):
+    return values.tolist() if isinstance(values, (np.ndarray, pd.Index, pd.Series)) else list(values)
+
+#========================================================================================
+def sheet_name(itemDict):
+    if itemDict["Type"].startswith('Serie'):
+        return f'{itemDict["Type"].split(" ")[0]} {itemDict["Id"]}'
+    return f'{itemDict["Type"]} {itemDict["Id"]}'
+
+def serie_columns(itemDict):
+    Serie = itemDict['Serie'].sort_index()                         # force sort on index
+    columns = [
+        (itemDict['X'], to_list(Serie.index)),
+        (itemDict['Y'], to_list(Serie.values)),
+        ('Type', [itemDict['Type']]),
+        ('Name', [itemDict['Name']]),
+        ('Y axis inverted', [itemDict['Y axis inverted']]),
+        ('Color', [itemDict['Color']]),
+        ('Comment', [itemDict['Comment']]),
+        ('History', [itemDict['History']]),
+    ]
+    if 'InterpolationMode' in itemDict:
+        columns += [
+            ('InterpolationMode', [itemDict['InterpolationMode']]),
+            ('X1Coords', to_list(itemDict['X1Coords'])),
+            ('X2Coords', to_list(itemDict['X2Coords'])),
+            (itemDict['XOriginal'], to_list(itemDict['XOriginalValues'])),
+        ]
+    return columns
+
+def filter_columns(itemDict):
+    return [(key, [itemDict[key]]) for key in ['Type', 'Name', 'Parameters', 'Comment', 'History']]
+
+def interpolation_columns(itemDict):
+    return [
+        ('X1Coords', to_list(itemDict['X1Coords'])),
+        ('X2Coords', to_list(itemDict['X2Coords'])),
+    ] + [(key, [itemDict[key]]) for key in ['X1Name', 'Type', 'Name', 'Comment', 'History']]
+
+#========================================================================================
+def write_xlsx_WorkSheet(outFile, itemDict_list, version, progress=None):
+    """xlsx worksheet of the item dicts, created with PyAnalyseries version
+    progress: called with (sheets written, number of item dicts) after each sheet"""
+
+    wb = Workbook(write_only=True)
+    autofit = len(itemDict_list) > 0
+
+    #----------------------------------
+    lines = [f'Created with PyAnalyseries {version}',
+             None,
+             "This file has been created with PyAnalySeries software.",
+             "Do not modify or accordingly with documentation."]
+    ws = wb.create_sheet(title='Information')
+    if autofit:
+        ws.column_dimensions['A'].width = column_width(None, lines)
+    set_dimension(ws, len(lines), 1)
+    for line in lines:
+        ws.append([line])
+
+    #----------------------------------
+    for n, itemDict in enumerate(itemDict_list):
+        if itemDict["Type"].startswith('Serie'):
+            write_sheet(wb, sheet_name(itemDict), serie_columns(itemDict))
+        elif itemDict["Type"] in ['FILTER', 'SAMPLE']:
+            write_sheet(wb, sheet_name(itemDict), filter_columns(itemDict))
+        elif itemDict["Type"] == 'INTERPOLATION':
+            write_sheet(wb, sheet_name(itemDict), interpolation_columns(itemDict))
+        if progress:
+            progress(n+1, len(itemDict_list))
+
+    wb.save(outFile)
@@ -0,0 +1,64 @@
+from PyQt5.QtCore import * 
+
+from resources.workSheetIO import read_WorkSheet, write_WorkSheet, release_source
+
+#=========================================================================================
+# Worksheet files read and written out of the GUI thread
+#
+#   the workers are run by QThreadPool.globalInstance(), several worksheets being saved in parallel;
+#   the item dicts (read) and the end of the save are delivered to the GUI thread through queued
+#   signals, the tree being only changed there
+#=========================================================================================
+class workSheetWorkerSignals(QObject):
+    progress = pyqtSignal(object, int, int)             # worker, sheets done, number of sheets
+    finished = pyqtSignal(object, object)               # worker, (item dicts, error messages) when read
+    error = pyqtSignal(object, str)                     # worker, message
+
+#=========================================================================================
+class loadWorkSheetWorker(QRunnable):
+    """Reads a worksheet file (series of xlsx files read on first access)"""
+
+    action = 'loading'
+
+    def __init__(self, fileName):
+        super().__init__()
+        self.fileName = fileName
+        self.result = None                              # set in the GUI thread
+        self.signals = workSheetWorkerSignals()
+
+    def run(self):
+        try:
+            result = read_WorkSheet(self.fileName, lazy=True,
+                                    progress=lambda done, total: self.signals.progress.emit(self, done, total))
+        except Exception as e:
+            self.signals.error.emit(self, str(e))
+            return
+        self.signals.finished.emit(self, result)
+
+#=========================================================================================
+class saveWorkSheetWorker(QRunnable):
+    """Writes a worksheet file from copies of the item dicts of the worksheet, made when the save
+    was asked; the series still read from the file (copies included) are read before"""
+
+    action = 'saving'
+
+    def __init__(self, fileName, itemDict_list, version):
+        super().__init__()
+        self.fileName = fileName
+        self.itemDict_list = itemDict_list
+        self.version = version
+        self.signals = workSheetWorkerSignals()
+
+    def run(self):
+        try:
+            release_source(self.fileName)               # lazy (or mapped) series still read from the file
+            write_WorkSheet(self.fileName, self.itemDict_list, self.version,
+                            progress=lambda done, total: self.signals.progress.emit(self, done, total))
+        except Exception as e:
+            self.signals.error.emit(self, str(e))
+            return
+        self.signals.finished.emit(self, None)
+
+#=========================================================================================
+class lazyItemSignals(QObject):
+    loaded = pyqtSignal(object)                         # LazyItemDict whose data has been read, in any thread